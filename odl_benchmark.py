@@ -0,0 +1,556 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+from types import SimpleNamespace
+from aiohttp import web
+from odl_upstream import RateLimited
+
+# Offline benchmark and load test. Everything the bot talks to is replaced by a
+# local stand-in serving recorded (or synthetic) fixtures:
+#   - PokéAPI: a real HTTP server on localhost, in its own thread
+#   - Sheets: a fake gspread client answering values_batch_get
+#   - YouTube: a fake googleapiclient answering channels.list and playlistItems.list
+# and the command handlers are driven with a concurrent stream of messages.
+
+# Variables
+FIXTURES_DIR = 'benchmark_fixtures'
+POKEAPI_URL = 'https://pokeapi.co/api/v2/'
+BASE_PLACEHOLDER = '{base}'  # Fixtures store PokéAPI URLs with this instead of the real base URL
+DEFAULT_MESSAGES = 2000
+DEFAULT_CONCURRENCY = 50
+DEFAULT_ROUNDS = 2  # The first round runs on empty caches, the next ones warm
+DEFAULT_LATENCY_MS = 20  # Added to every fake upstream call
+TYPO_RATE = 0.3  # Share of names sent with a spelling mistake, to exercise correct_spelling
+RECORD_SAMPLE = 150  # Pokémon, moves, abilities and items recorded in full by `record`
+
+# Relative weight of each command in the synthetic message stream
+COMMAND_MIX = {
+    'pokemon': 30,
+    'type': 15,
+    'move': 15,
+    'team': 10,
+    'mvp': 10,
+    'week': 10,
+    'standings': 5,
+    'check_new_video': 1,
+}
+
+# Fixtures
+def fixture_path(directory, name):
+    return os.path.join(directory, f'{name}.json')
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """Returns the recorded fixtures in directory, or None if any part is missing."""
+    fixtures = {}
+    for name in ('pokeapi', 'sheets', 'youtube'):
+        path = fixture_path(directory, name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            fixtures[name] = json.load(file)
+    return fixtures
+
+def save_fixture(directory, name, data):
+    os.makedirs(directory, exist_ok=True)
+    with open(fixture_path(directory, name), 'w') as file:
+        json.dump(data, file)
+
+def synthetic_fixtures(seed=0):
+    """Builds fixtures shaped like the real data, for when nothing was recorded."""
+    rng = random.Random(seed)
+    syllables = ['ba', 'chu', 'da', 'ee', 'fo', 'gar', 'ka', 'lu', 'mi', 'no', 'pi', 'ra', 'sa', 'to', 'vee', 'zor']
+
+    def names(count, words=1):
+        found = set()
+        while len(found) < count:
+            found.add('-'.join(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(words)))
+        return sorted(found)
+
+    def listing(kind, entries):
+        return {'count': len(entries), 'results': [{'name': n, 'url': f'{BASE_PLACEHOLDER}{kind}/{i + 1}/'} for i, n in enumerate(entries)]}
+
+    def effect(text):
+        return [{'effect': f'{text} effect.', 'short_effect': f'{text}.', 'language': {'name': 'en'}}]
+
+    type_names = ['normal', 'fire', 'water', 'grass', 'electric', 'ice', 'fighting', 'poison', 'ground', 'flying',
+                  'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy']
+    pokemon = names(1000)
+    moves, abilities, items = names(900, 2), names(300, 2), names(2000, 2)
+
+    pokeapi = {
+        'pokemon?limit=1000': listing('pokemon', pokemon),
+        'move?limit=1000': listing('move', moves),
+        'ability?limit=1000': listing('ability', abilities),
+        'item?limit=2500': listing('item', items),
+        'type': listing('type', type_names + ['unknown', 'shadow']),
+        'pokemon-species?limit=1100': listing('pokemon-species', pokemon),
+    }
+    for t in type_names:
+        others = rng.sample(type_names, 9)
+        pokeapi[f'type/{t}'] = {'name': t, 'damage_relations': {
+            'double_damage_to': [{'name': n} for n in others[:3]],
+            'half_damage_to': [{'name': n} for n in others[3:7]],
+            'no_damage_to': [{'name': n} for n in others[7:8]],
+        }}
+    for i, name in enumerate(pokemon, 1):
+        pokeapi[f'pokemon/{name}'] = {
+            'name': name,
+            'types': [{'type': {'name': t}} for t in rng.sample(type_names, rng.randint(1, 2))],
+            'abilities': [{'ability': {'name': a}} for a in rng.sample(abilities, 2)],
+            'stats': [{'stat': {'name': s}, 'base_stat': rng.randint(20, 150)}
+                      for s in ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')],
+            'base_experience': rng.randint(50, 300),
+            'species': {'url': f'{BASE_PLACEHOLDER}pokemon-species/{i}/'},
+            'sprites': {'front_default': f'https://example.invalid/{i}.png'},
+        }
+        chain = (i - 1) // 3 + 1
+        pokeapi[f'pokemon-species/{i}'] = {'name': name, 'habitat': {'name': rng.choice(['cave', 'forest', 'sea', 'urban'])},
+                                           'evolution_chain': {'url': f'{BASE_PLACEHOLDER}evolution-chain/{chain}/'}}
+    for chain in range(1, (len(pokemon) + 2) // 3 + 1):
+        members = pokemon[(chain - 1) * 3:chain * 3]
+        node = None
+        for name in reversed(members):
+            node = {'species': {'name': name}, 'evolves_to': [node] if node else [],
+                    'evolution_details': [{'trigger': {'name': 'level-up'}, 'min_level': rng.randint(10, 50)}]}
+        pokeapi[f'evolution-chain/{chain}'] = {'id': chain, 'chain': node}
+    for name in moves:
+        pokeapi[f'move/{name}'] = {'name': name, 'type': {'name': rng.choice(type_names)}, 'power': rng.choice([None, 40, 80, 120]),
+                                   'pp': rng.choice([5, 10, 15, 35]), 'accuracy': rng.choice([None, 80, 100]), 'effect_entries': effect(name)}
+    for name in abilities:
+        pokeapi[f'ability/{name}'] = {'name': name, 'effect_entries': effect(name)}
+    for name in items:
+        pokeapi[f'item/{name}'] = {'name': name, 'category': {'name': 'held-items'}, 'cost': rng.randint(0, 10000), 'effect_entries': effect(name)}
+
+    # A 16 team league: draft board, MVP race, standings and a round robin schedule
+    team_names = [f'{name.title()} Squad' for name in names(16)]
+    coaches = [name.title() for name in names(16)]
+    board_width = 4 * len(team_names)
+    draft = [[''] * board_width, [''] * board_width] + [[''] * board_width for _ in range(12)]
+    mvp = [[], [], []]
+    drafted = rng.sample(pokemon, 12 * len(team_names))
+    for t, (team, coach) in enumerate(zip(team_names, coaches)):
+        draft[0][4 * t], draft[1][4 * t] = team, coach
+        for p in range(12):
+            name = drafted[12 * t + p]
+            draft[2 + p][4 * t] = name.title()
+            draft[2 + p][4 * t + 1] = rng.choice(type_names).title()
+            kills, deaths = rng.randint(0, 20), rng.randint(0, 10)
+            mvp.append(['', '', '', '', name.title(), coach, '', str(kills), str(deaths), str(kills - deaths)])
+    mvp[3:] = sorted(mvp[3:], key=lambda row: -int(row[9]))
+    for rank, row in enumerate(mvp[3:], 1):
+        row[2] = f'#{rank}'
+    standings = [[], [], []] + [['', '', f'#{i + 1}', '', team, coach, f'{rng.randint(0, 11)}-{rng.randint(0, 11)}']
+                                for i, (team, coach) in enumerate(zip(team_names, coaches))]
+    data = [['header'] * 18]
+    for t, team in enumerate(team_names[:8]):
+        data.append(['', '', '', team] + [''] * 14)
+    for week in range(1, 12):
+        for t in range(len(team_names) // 2):
+            row = [''] * 18
+            row[7], row[9], row[17] = str(week), str((t + week) % 8 + 1), str((7 - t + week) % 8 + 1)
+            data.append(row)
+    rules = [[str(i), f'Rule number {i}'] for i in range(1, 7)]
+    sheets = {"'Standings'": standings, "'MVP Race'": mvp, "'Draft But Simple'": draft, "'Rules'!C11:D16": rules, "'Data'": data}
+
+    youtube = {}
+    for c in range(8):
+        handle = f'channel{c}'
+        uploads = [{'snippet': {'title': f'{handle} video {v}', 'publishedAt': f'2026-01-{1 + v % 28:02d}T{v % 24:02d}:00:00Z'},
+                    'contentDetails': {'videoId': f'{handle}-{v}', 'videoPublishedAt': f'2026-01-{1 + v % 28:02d}T{v % 24:02d}:00:00Z'}}
+                   for v in range(120)]
+        uploads.sort(key=lambda item: item['contentDetails']['videoPublishedAt'], reverse=True)  # Newest first, like the real playlist
+        youtube[handle] = {'channel_id': f'UC{c:022d}', 'uploads_playlist_id': f'UU{c:022d}', 'uploads': uploads}
+    return {'pokeapi': pokeapi, 'sheets': sheets, 'youtube': youtube}
+
+# Stand-ins for the upstream services
+class FakePokeAPI(threading.Thread):
+    """Serves the PokéAPI fixtures over HTTP on localhost from its own thread and event loop."""
+
+    def __init__(self, responses, latency):
+        super().__init__(daemon=True)
+        self.responses = responses
+        self.latency = latency
+        self.requests = 0
+        self.base_url = None
+        self.started = threading.Event()
+        self.loop = None
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self._start())
+        self.started.set()
+        self.loop.run_forever()
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/api/v2/{tail:.*}', self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        self.base_url = f'http://127.0.0.1:{port}/api/v2/'
+        # Serialize once, pointing every URL in the fixtures at this server
+        self.bodies = {endpoint: json.dumps(data).replace(BASE_PLACEHOLDER, self.base_url) for endpoint, data in self.responses.items()}
+
+    async def _handle(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        endpoint = request.match_info['tail'].strip('/')
+        if request.query_string:
+            endpoint += '?' + request.query_string
+        body = self.bodies.get(endpoint)
+        if body is None:
+            return web.Response(status=404)
+        return web.Response(text=body, content_type='application/json')
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+class FakeSpreadsheet:
+    def __init__(self, sheets, latency):
+        self.sheets = sheets
+        self.latency = latency
+
+    def values_batch_get(self, ranges):
+        time.sleep(self.latency)
+        return {'valueRanges': [{'range': r, 'values': self.sheets.get(r, [])} for r in ranges]}
+
+class FakeSheetsClient:
+    """Just enough of a gspread client for SheetSnapshot."""
+
+    def __init__(self, sheets, latency):
+        self.spreadsheet = FakeSpreadsheet(sheets, latency)
+
+    def open(self, name):
+        return self.spreadsheet
+
+class FakeRequest:
+    def __init__(self, response, latency):
+        self.response = response
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return self.response
+
+class FakeYouTube:
+    """Just enough of the googleapiclient YouTube resource for the poller."""
+
+    def __init__(self, channels, latency):
+        self.by_handle = channels
+        self.by_playlist = {c['uploads_playlist_id']: c for c in channels.values()}
+        self.latency = latency
+
+    def channels(self):
+        return self
+
+    def playlistItems(self):
+        return SimpleNamespace(list=self._list_uploads)
+
+    def list(self, part, forHandle, maxResults):
+        channel = self.by_handle.get(forHandle)
+        items = [{'id': channel['channel_id'], 'contentDetails': {'relatedPlaylists': {'uploads': channel['uploads_playlist_id']}}}] if channel else []
+        return FakeRequest({'items': items}, self.latency)
+
+    def _list_uploads(self, part, playlistId, maxResults, pageToken=None):
+        uploads = self.by_playlist[playlistId]['uploads']
+        start = int(pageToken or 0)
+        response = {'items': uploads[start:start + maxResults]}
+        if start + maxResults < len(uploads):
+            response['nextPageToken'] = str(start + maxResults)
+        return FakeRequest(response, self.latency)
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.name = f'channel-{channel_id}'
+        self.guild = SimpleNamespace(me=None)
+        self.sent = 0
+
+    def permissions_for(self, member):
+        return SimpleNamespace(send_messages=True)
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+
+class FakeDiscordBot:
+    def __init__(self):
+        self.channels = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.setdefault(channel_id, FakeChannel(channel_id))
+
+class FakeContext:
+    """Stands in for commands.Context; replies are only counted."""
+
+    def __init__(self):
+        self.replies = 0
+
+    async def send(self, content=None, **kwargs):
+        self.replies += 1
+
+# Load generation
+def misspell(name, rng):
+    """Introduces one typo (dropped, doubled or swapped letter) in some of the names."""
+    if rng.random() >= TYPO_RATE or len(name) < 5:
+        return name
+    i = rng.randrange(1, len(name) - 2)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return name[:i] + name[i + 1:]
+    if kind == 1:
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+def generate_messages(bot, count, rng):
+    """Returns count (command, kwargs) pairs drawn from COMMAND_MIX."""
+    names = {
+        'pokemon': bot.pokemon_names,
+        'move': bot.move_names,
+        'type': [t for t in bot.type_names if t not in bot.NON_BATTLE_TYPES],
+        'team': [r.coach_name for r in bot.roster_index.values()] + [r.team_name for r in bot.roster_index.values()],
+    }
+    weeks = list(bot.valid_weeks) or [1]
+    commands, weights = zip(*COMMAND_MIX.items())
+    messages = []
+    for command in rng.choices(commands, weights, k=count):
+        if command == 'pokemon':
+            kwargs = {'name': misspell(rng.choice(names['pokemon']), rng)}
+        elif command == 'move':
+            kwargs = {'move_name': misspell(rng.choice(names['move']), rng)}
+        elif command == 'type':
+            kwargs = {'types': ' '.join(misspell(t, rng) for t in rng.sample(names['type'], rng.randint(1, 2)))}
+        elif command == 'team':
+            kwargs = {'query': misspell(rng.choice(names['team']), rng)}
+        elif command == 'mvp':
+            kwargs = {'options': rng.choice(['', 'kills', 'diff', 'page 2', f"coach {rng.choice(names['team'])}"])}
+        elif command == 'week':
+            kwargs = {'week_number': rng.choice(weeks)}
+        else:
+            kwargs = {}
+        messages.append((command, kwargs))
+    return messages
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+async def run_round(handlers, messages, concurrency, metrics):
+    """Sends every message through its handler with concurrency messages in flight at once."""
+    latencies = {}
+    queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+
+    async def handle(command, kwargs):
+        ctx = FakeContext()
+        phases = metrics.start_command()
+        started = time.perf_counter()
+        try:
+            await handlers[command](ctx, **kwargs)
+        except RateLimited as e:
+            await ctx.send(str(e))  # The bot's on_command_error replies that the upstream is busy
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.finish_command(command, phases, elapsed)
+            latencies.setdefault(command, []).append(elapsed)
+
+    async def worker():
+        while not queue.empty():
+            command, kwargs = queue.get_nowait()
+            # Each message in its own task, so per-task state (like upstream priority) doesn't leak between them
+            await asyncio.create_task(handle(command, kwargs))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+def print_round(title, wall, latencies, metrics):
+    total = sorted(v for values in latencies.values() for v in values)
+    print(f"\n{title}: {len(total)} messages in {wall:.2f}s, {len(total) / wall:.0f} msg/s, "
+          f"p50 {percentile(total, 0.5) * 1000:.1f} ms, p99 {percentile(total, 0.99) * 1000:.1f} ms")
+    print(f"{'command':<16}{'count':>7}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}   mean match / fetch / render ms")
+    for command, values in sorted(latencies.items()):
+        values.sort()
+        means = []
+        for phase in ('match', 'fetch', 'render'):
+            histogram = metrics.histograms.get((command, phase))
+            means.append(f"{histogram.sum / histogram.count * 1000:.2f}" if histogram and histogram.count else '-')
+        print(f"{command:<16}{len(values):>7}{percentile(values, 0.5) * 1000:>9.1f}{percentile(values, 0.99) * 1000:>9.1f}"
+              f"{values[-1] * 1000:>9.1f}   {' / '.join(means)}")
+
+async def benchmark(args):
+    fixtures = load_fixtures(args.fixtures)
+    if fixtures is None:
+        print(f"No recorded fixtures in {args.fixtures}/, using synthetic data")
+        fixtures = synthetic_fixtures(args.seed)
+    latency = args.latency / 1000
+
+    server = FakePokeAPI(fixtures['pokeapi'], latency)
+    server.start()
+    server.started.wait()
+
+    # Configure and import the bot only now: its modules read these at import time
+    workdir = tempfile.mkdtemp(prefix='odl-benchmark-')
+    os.chdir(workdir)
+    with open('channel_urls.txt', 'w') as file:
+        file.write('\n'.join(f'https://www.youtube.com/@{handle}' for handle in fixtures['youtube']))
+    os.environ.update({
+        'POKEAPI_BASE_URL': server.base_url,
+        'POKEAPI_CACHE_FILE': os.path.join(workdir, 'pokeapi_cache.sqlite3'),
+        'POKEAPI_BUNDLE_FILE': os.path.join(workdir, 'no_bundle.sqlite3'),
+        'POKEAPI_REQUESTS_PER_SECOND': str(args.pokeapi_rate),
+        'YOUTUBE_QUOTA_PER_DAY': str(10 ** 9),  # The fake has no quota, don't let the limiter skip channels
+        'YOUTUBE_API_KEY': 'benchmark',
+        'METRICS_FILE': os.path.join(workdir, 'odl_metrics.prom'),
+    })
+    import odl_bot
+    import odl_youtube_
+    import odl_metrics
+    import odl_pokeapi
+
+    odl_bot.snapshot.authorize = lambda: FakeSheetsClient(fixtures['sheets'], latency)
+    youtube = FakeYouTube(fixtures['youtube'], latency)
+    odl_youtube_.get_youtube = lambda: youtube
+    odl_youtube_.bot = FakeDiscordBot()
+    odl_youtube_.open_poller()  # What setup() does, without starting the loops
+
+    async def check_new_video(ctx):
+        odl_youtube_.schedules.clear()  # Every channel due on every check
+        await odl_youtube_.check_new_video.coro()
+
+    handlers = {
+        'pokemon': odl_bot.pokemon_info.callback,
+        'type': odl_bot.type_info.callback,
+        'move': odl_bot.move_info.callback,
+        'team': odl_bot.team.callback,
+        'mvp': odl_bot.mvp.callback,
+        'week': odl_bot.week.callback,
+        'standings': odl_bot.standings.callback,
+        'check_new_video': check_new_video,
+    }
+
+    if args.trace_memory:
+        tracemalloc.start()
+    log = io.StringIO()  # The bot's own prints would drown the report
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            await odl_bot.warm_up_pokeapi()
+            await odl_bot.snapshot.refresh()
+        print(f"Warm-up: {time.perf_counter() - started:.2f}s")
+
+        rng = random.Random(args.seed)
+        for round_number in range(1, args.rounds + 1):
+            messages = generate_messages(odl_bot, args.messages, rng)
+            odl_metrics.histograms.clear()
+            with contextlib.redirect_stdout(log):
+                wall, latencies = await run_round(handlers, messages, args.concurrency, odl_metrics)
+            print_round(f"Round {round_number} ({'cold' if round_number == 1 else 'warm'} caches)", wall, latencies, odl_metrics)
+    finally:
+        with contextlib.redirect_stdout(log):
+            await odl_pokeapi.close_session()
+        odl_youtube_.close_poller()
+        server.stop()
+
+    print(f"\nFake PokéAPI requests: {server.requests}, peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB", end='')
+    if args.trace_memory:
+        print(f", peak Python heap: {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB")
+        tracemalloc.stop()
+    else:
+        print()
+    hits, misses, rate = odl_metrics.hit_rate('pokeapi')
+    print(f"PokéAPI cache hit rate: {rate:.1%} of {hits + misses}")
+
+async def record(args):
+    """Records fixtures from the live services, so benchmarks run on real data."""
+    import odl_pokeapi
+    import odl_sheets
+    rng = random.Random(args.seed)
+
+    entries = {}
+
+    async def fetch(endpoint):
+        try:
+            data = await odl_pokeapi.fetch_pokeapi_data(endpoint)
+        except odl_pokeapi.NotFound:
+            data = None
+        if data is not None:
+            entries[endpoint] = data
+        return data
+
+    try:
+        lists = dict(zip(odl_pokeapi.NAME_LIST_ENDPOINTS, await asyncio.gather(*(fetch(e) for e in odl_pokeapi.NAME_LIST_ENDPOINTS.values()))))
+        await fetch(odl_pokeapi.SPECIES_LIST_ENDPOINT)
+        details = [f"type/{r['name']}" for r in lists['type']['results']]
+        for category in ('pokemon', 'move', 'ability', 'item'):
+            results = lists[category]['results']
+            details += [f"{category}/{r['name']}" for r in rng.sample(results, min(RECORD_SAMPLE, len(results)))]
+        fetched = await asyncio.gather(*(fetch(e) for e in details))
+        species = {odl_pokeapi.endpoint_from_url(d['species']['url']) for d in fetched if d and 'species' in d}
+        species_data = await asyncio.gather(*(fetch(e) for e in sorted(species)))
+        chains = {odl_pokeapi.endpoint_from_url(d['evolution_chain']['url']) for d in species_data if d and d.get('evolution_chain')}
+        await asyncio.gather(*(fetch(e) for e in sorted(chains)))
+    finally:
+        await odl_pokeapi.close_session()
+    save_fixture(args.fixtures, 'pokeapi', json.loads(json.dumps(entries).replace(odl_pokeapi.POKEAPI_BASE_URL, BASE_PLACEHOLDER)))
+    print(f"Recorded {len(entries)} PokéAPI responses")
+
+    try:
+        import odl_bot
+        spreadsheet = odl_bot.authorize_sheets().open(odl_sheets.SPREADSHEET_NAME)
+        response = spreadsheet.values_batch_get(list(odl_sheets.SNAPSHOT_RANGES.values()))
+        sheets = {value_range_key: value_range.get('values', [])
+                  for value_range_key, value_range in zip(odl_sheets.SNAPSHOT_RANGES.values(), response.get('valueRanges', []))}
+        save_fixture(args.fixtures, 'sheets', sheets)
+        print(f"Recorded {len(sheets)} sheet ranges")
+    except Exception as e:
+        print(f"Could not record the spreadsheet ({e!r}), using synthetic sheets instead")
+        save_fixture(args.fixtures, 'sheets', synthetic_fixtures(args.seed)['sheets'])
+
+    try:
+        import odl_youtube_
+        channels = {}
+        for url in odl_youtube_.read_channel_urls():
+            if '@' not in url:
+                continue
+            handle = url.split('@')[1]
+            channel = odl_youtube_.get_channel_by_handle(handle)
+            if channel:
+                page = odl_youtube_.list_uploads(channel['uploads_playlist_id'], odl_youtube_.UPLOADS_PAGE_SIZE, None)
+                channels[handle] = dict(channel, uploads=page.get('items', []))
+        save_fixture(args.fixtures, 'youtube', channels)
+        print(f"Recorded uploads of {len(channels)} YouTube channels")
+    except Exception as e:
+        print(f"Could not record YouTube ({e!r}), using synthetic channels instead")
+        save_fixture(args.fixtures, 'youtube', synthetic_fixtures(args.seed)['youtube'])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline benchmark and load test for ODLBot.")
+    parser.add_argument('--fixtures', default=os.path.abspath(FIXTURES_DIR), help="Directory of recorded fixtures.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data and message stream.")
+    subcommands = parser.add_subparsers(dest='command')
+    run = subcommands.add_parser('run', help="Run the benchmark (the default).")
+    subcommands.add_parser('record', help="Record fixtures from the live PokéAPI, spreadsheet and YouTube.")
+    for options in (parser, run):
+        options.add_argument('--messages', type=int, default=DEFAULT_MESSAGES, help="Messages per round.")
+        options.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Messages in flight at once.")
+        options.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="Rounds; the first starts with empty caches.")
+        options.add_argument('--latency', type=float, default=DEFAULT_LATENCY_MS, help="Milliseconds added to every fake upstream call.")
+        options.add_argument('--pokeapi-rate', type=float, default=1000, help="PokéAPI requests per second allowed by the rate limiter.")
+        options.add_argument('--trace-memory', action='store_true', help="Also report the peak Python heap (slower).")
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(record(args) if args.command == 'record' else benchmark(args))
@@ -1,12 +1,22 @@
 import os
+import time
+import heapq
+import asyncio
+from collections import namedtuple
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import tasks, commands
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from dotenv import load_dotenv
-import requests
-from functools import lru_cache
-from thefuzz import fuzz, process  # Fuzzy string matching
+from odl_pokeapi import get_pokeapi_data, close_session, data_version, endpoint_from_url, NAME_LIST_ENDPOINTS, SPECIES_LIST_ENDPOINT
+from odl_matching import NameMatcher, normalize
+from odl_types import TypeChart, NON_BATTLE_TYPES
+from odl_sheets import SheetSnapshot, SHEETS_REFRESH_MINUTES
+from odl_render import RenderCache
+from odl_upstream import run_as_background, RateLimited
+import odl_metrics
+from odl_metrics import timed
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +24,8 @@ load_dotenv()
 # Variables
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 GOOGLE_CREDENTIALS_FILE = '/home/jsm177y/ODLBot/odlbot-421819-5192c6bbcd6c.json'
+DISCORD_MESSAGE_LIMIT = 2000
+EXTENSIONS = os.getenv('ODL_EXTENSIONS', 'odl_youtube_').split()  # Loaded at startup, reloadable with !reload
 
 # Set up Discord intents
 intents = discord.Intents.default()
@@ -24,62 +36,184 @@ intents.guilds = True
 # Discord Bot setup
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# Startup readiness: each phase warms up in the background and commands wait on its event
+STARTED_AT = time.perf_counter()
+STARTUP_WAIT_SECONDS = 30  # How long a command waits for a phase before using whatever is loaded
+POKEAPI_RETRY_MINUTES = 1  # First retry of a failed PokéAPI warm-up, doubling every time
+POKEAPI_RETRY_MAX_MINUTES = 60
+ready = {'pokeapi': asyncio.Event(), 'sheets': asyncio.Event()}
+startup_times = {}  # Phase -> seconds from process start until ready
+startup_tasks = set()
+
+def mark_ready(phase):
+    """Records the time-to-ready of a startup phase and wakes commands waiting on it."""
+    if phase not in startup_times:
+        startup_times[phase] = time.perf_counter() - STARTED_AT
+        print(f"Startup: {phase} ready after {startup_times[phase]:.2f}s")
+    if phase in ready:
+        ready[phase].set()
+
+async def wait_until_ready(*phases):
+    """Waits for the given startup phases, giving up after STARTUP_WAIT_SECONDS."""
+    try:
+        await asyncio.wait_for(asyncio.gather(*(ready[p].wait() for p in phases)), STARTUP_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        print(f"Still waiting on {', '.join(p for p in phases if not ready[p].is_set())}, continuing without it")
+
 # Google Sheets setup
 scope = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CREDENTIALS_FILE, scope)
-client = gspread.authorize(creds)
-sheet = client.open("Oshawott Draft League").worksheet('Standings')
 
-# Fetch team names from the "Data" sheet
-data_sheet = client.open("Oshawott Draft League").worksheet('Data')
-team_names = data_sheet.get('D2:D9')
+def authorize_sheets():
+    """Authorizes the Google Sheets client. Blocking, so the snapshot calls it from a worker thread."""
+    creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CREDENTIALS_FILE, scope)
+    return gspread.authorize(creds)
 
-# Convert the fetched data to a dictionary
-teams = {index + 1: team[0] for index, team in enumerate(team_names)}
+snapshot = SheetSnapshot(authorize_sheets)  # Standings, MVP Race, Draft But Simple, Rules and Data, refreshed in the background
 
-# Fetch matchup data
-matchup_data = data_sheet.get_all_values()
-week_matchups = {}
+teams = {}
+week_matchups = {}  # Week -> ["Team A vs Team B", ...], already deduped and name-resolved
+valid_weeks = range(0)
 
-# Process the matchup data
-for row in matchup_data[1:]:  # Skip the header row
-    try:
-        week = int(row[7])  # Column H
-        team1 = int(row[9])  # Column J
-        team2 = int(row[17])  # Column R
-
-        if week not in week_matchups:
-            week_matchups[week] = set()  # Use a set to prevent duplicates
-        week_matchups[week].add((team1, team2))
-    except (ValueError, IndexError):
-        continue
-
-# Caching functions
-@lru_cache(maxsize=128)
-def get_pokeapi_data(endpoint: str):
-    """Cached function to get data from the PokéAPI."""
-    url = f"https://pokeapi.co/api/v2/{endpoint}/"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return None
+def build_week_matchups(data_values):
+    """Builds teams and week_matchups from the "Data" sheet values."""
+    global teams, week_matchups, valid_weeks
+
+    # Team names are in D2:D9
+    teams = {index + 1: row[3] for index, row in enumerate(data_values[1:9]) if len(row) > 3}
+
+    # Process the matchup data, skipping the mirror of every pairing
+    matchups = {}
+    seen = set()
+    for row in data_values[1:]:  # Skip the header row
+        try:
+            week = int(row[7])  # Column H
+            team1 = int(row[9])  # Column J
+            team2 = int(row[17])  # Column R
+        except (ValueError, IndexError):
+            continue
+        pairing = (week, frozenset((team1, team2)))
+        if pairing in seen:
+            continue
+        seen.add(pairing)
+        matchups.setdefault(week, []).append(f"{teams.get(team1, f'Team {team1}')} vs {teams.get(team2, f'Team {team2}')}")
+
+    week_matchups = matchups
+    valid_weeks = range(min(matchups), max(matchups) + 1) if matchups else range(0)
+
+# One record per team column of the 'Draft But Simple' sheet; pokemon is a list of (name, [types])
+Roster = namedtuple('Roster', ['team_name', 'coach_name', 'pokemon'])
+roster_index = {}  # Normalized team or coach name -> Roster
+owner_index = {}  # Normalized drafted Pokémon name -> [(drafted name, Roster)]
+
+def build_draft_index(draft_values):
+    """Indexes the draft board by team, coach and drafted Pokémon."""
+    global roster_index, owner_index
+    rosters = []
+    header = draft_values[0] if draft_values else []
+    for index, col in enumerate(header):
+        if not col.strip():
+            continue  # Type columns next to each team have no header
+        coach_name = draft_values[1][index] if len(draft_values) > 1 else "Not specified"
+        pokemon = []
+        for row in draft_values[2:]:
+            if index < len(row) and row[index].strip():
+                types = [t.strip() for t in row[index+1:index+4] if t.strip()]
+                pokemon.append((row[index], types))
+        rosters.append(Roster(col, coach_name, pokemon))
+
+    teams_by_name = {}
+    owners = {}
+    for roster in rosters:
+        for name in (roster.team_name, roster.coach_name):
+            if name.strip():
+                teams_by_name.setdefault(normalize(name), roster)
+        for pokemon_name, _ in roster.pokemon:
+            owners.setdefault(normalize(pokemon_name), []).append((pokemon_name, roster))
+    roster_index = teams_by_name
+    owner_index = owners
+
+    # Fuzzy matching straight against the names on the board
+    matchers['team'] = NameMatcher([n for r in rosters for n in (r.team_name, r.coach_name) if n.strip()])
+    matchers['drafted'] = NameMatcher([name for r in rosters for name, _ in r.pokemon])
+
+def lookup_roster(query):
+    """Returns the Roster for a team or coach name, correcting its spelling first."""
+    return roster_index.get(normalize(correct_spelling(query, 'team')))
+
+# Parsed rows of the 'MVP Race' sheet
+MvpEntry = namedtuple('MvpEntry', ['rank', 'pokemon', 'coach_name', 'kills', 'deaths', 'diff'])
+MVP_PAGE_SIZE = 15
+MVP_SORT_KEYS = {
+    'rank': lambda e: e.rank,
+    'kills': lambda e: (-e.kills, e.rank),
+    'diff': lambda e: (-e.diff, e.rank),
+}
+mvp_entries = []
+
+def build_mvp_leaderboard(mvp_values):
+    """Parses the 'MVP Race' rows into MvpEntry records, skipping rows that don't parse."""
+    global mvp_entries
+    entries = []
+    skipped = 0
+    for row in mvp_values[3:]:  # Assumes the first three rows are headers or empty
+        if all(cell.strip() == '' for cell in row):
+            continue
+        try:
+            entries.append(MvpEntry(int(row[2].strip().strip('#')), row[4], row[5], int(row[7]), int(row[8]), int(row[9])))
+        except (ValueError, IndexError):
+            skipped += 1
+    mvp_entries = entries
+    matchers['coach'] = NameMatcher([e.coach_name for e in entries])
+    if skipped:
+        print(f"Skipped {skipped} malformed MVP Race rows")
+
+def lookup_mvp_coach(query):
+    """Returns the normalized MVP Race coach for a coach or team name, correcting its spelling first."""
+    corrected = correct_spelling(query, 'team')
+    roster = roster_index.get(normalize(corrected))
+    if roster is not None and normalize(roster.team_name) == normalize(corrected):
+        query = roster.coach_name  # A team name stands for its coach
+    return normalize(correct_spelling(query, 'coach'))
+
+def mvp_top(k, sort='rank', coach=None):
+    """Returns the top k entries by the given sort key, optionally for one coach only."""
+    entries = mvp_entries
+    if coach is not None:
+        entries = [e for e in entries if normalize(e.coach_name) == coach]
+    return heapq.nsmallest(k, entries, key=MVP_SORT_KEYS[sort])
+
+def on_snapshot_refresh(snapshot):
+    # Only rebuild the indexes whose sheet actually changed
+    if 'data' in snapshot.changed:
+        build_week_matchups(snapshot.values.get('data', []))
+        print(f"Rebuilt matchups for weeks {valid_weeks.start}-{valid_weeks.stop - 1}" if valid_weeks else "No matchups found in the Data sheet")
+    if 'mvp' in snapshot.changed:
+        build_mvp_leaderboard(snapshot.values.get('mvp', []))
+    if 'draft' in snapshot.changed:
+        build_draft_index(snapshot.values.get('draft', []))
+        print(f"Indexed {len(roster_index)} team/coach names and {len(owner_index)} drafted Pokémon")
+    mark_ready('sheets')
+
+snapshot.add_listener(on_snapshot_refresh)
 
 # Function to correct spelling using fuzzy matching
 def correct_spelling(name, category):
     """Function to correct spelling using fuzzy matching."""
-    if category == 'pokemon':
-        choices = pokemon_names + special_forms
-    elif category == 'move':
-        choices = move_names
-    elif category == 'ability':
-        choices = ability_names
-    elif category == 'type':
-        choices = type_names
-    else:
+    matcher = matchers.get(category)
+    if matcher is None:
         return name
+    with timed('match'):
+        return matcher.correct(name)
 
-    match, score = process.extractOne(name, choices, scorer=fuzz.ratio)
-    return match if score > 70 else name  # Adjust threshold to 70
+def build_matchers():
+    """Indexes the loaded name lists once so correct_spelling doesn't rescan them."""
+    matchers.update({
+        'pokemon': NameMatcher(pokemon_names + special_forms),
+        'move': NameMatcher(move_names),
+        'ability': NameMatcher(ability_names),
+        'type': NameMatcher(type_names),
+        'item': NameMatcher(item_names),
+    })
 
 # Initialize fuzzy matching data
 pokemon_names = []
@@ -101,171 +235,623 @@ special_forms = [
 move_names = []
 ability_names = []
 type_names = []
+item_names = []
+species_endpoints = {}  # Species name -> pokemon-species/<id> endpoint
+matchers = {}  # Category -> NameMatcher, built by build_matchers, build_draft_index and build_mvp_leaderboard
+
+type_chart = None  # TypeChart, built once from the type data by get_type_chart
+rendered = RenderCache()  # Final replies of !type, !move, !ability, !item, !standings and !tera
+
+async def get_type_chart():
+    """Returns the type effectiveness chart, building it from the PokéAPI type data on first use."""
+    global type_chart
+    if type_chart is None and type_names:
+        battle_types = [t for t in type_names if t not in NON_BATTLE_TYPES]
+        type_data = await asyncio.gather(*(get_pokeapi_data(f'type/{t}') for t in battle_types))
+        if None not in type_data:
+            type_chart = TypeChart.from_type_data(dict(zip(battle_types, type_data)))
+    return type_chart
+
+async def warm_up_pokeapi():
+    """Loads the name lists, fuzzy matchers and type chart. Returns True if all of them loaded."""
+    try:
+        return await load_pokeapi_lists()
+    finally:
+        # Even a failed warm-up mustn't hold every PokéAPI command up for STARTUP_WAIT_SECONDS
+        mark_ready('pokeapi')
+
+async def keep_pokeapi_warm():
+    """Runs the PokéAPI warm-up until everything is loaded, backing off between attempts."""
+    delay = POKEAPI_RETRY_MINUTES * 60
+    while True:
+        try:
+            if await warm_up_pokeapi():
+                return
+        except Exception as e:
+            print(f"Error warming up the PokéAPI data: {e}")
+        print(f"Retrying the PokéAPI warm-up in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, POKEAPI_RETRY_MAX_MINUTES * 60)
+
+async def load_pokeapi_lists():
+    global pokemon_names, special_forms, move_names, ability_names, type_names, item_names, species_endpoints
+
+    # Load data for fuzzy matching, fetching all the lists concurrently. Lists loaded
+    # by an earlier attempt come straight from the cache.
+    # With a PokéAPI bundle on disk this is served locally in a few milliseconds.
+    pokemon_data, move_data, ability_data, type_data, item_data, species_data = await asyncio.gather(
+        get_pokeapi_data(NAME_LIST_ENDPOINTS['pokemon']),
+        get_pokeapi_data(NAME_LIST_ENDPOINTS['move']),
+        get_pokeapi_data(NAME_LIST_ENDPOINTS['ability']),
+        get_pokeapi_data(NAME_LIST_ENDPOINTS['type']),
+        get_pokeapi_data(NAME_LIST_ENDPOINTS['item']),
+        get_pokeapi_data(SPECIES_LIST_ENDPOINT),
+    )
+    if pokemon_data:
+        pokemon_names = [p['name'] for p in pokemon_data['results']]
+    if move_data:
+        move_names = [m['name'] for m in move_data['results']]
+    if ability_data:
+        ability_names = [a['name'] for a in ability_data['results']]
+    if type_data:
+        type_names = [t['name'] for t in type_data['results']]
+    if item_data:
+        item_names = [i['name'] for i in item_data['results']]
+    if species_data:
+        species_endpoints = {sp['name']: endpoint_from_url(sp['url']) for sp in species_data['results']}
+    complete = all((pokemon_data, move_data, ability_data, type_data, item_data, species_data))
+    if not complete:
+        print("Some PokéAPI name lists could not be loaded, spelling correction will be limited")
+    build_matchers()
+    return await get_type_chart() is not None and complete
+
+def start_background_task(coro):
+    task = asyncio.create_task(coro)
+    startup_tasks.add(task)
+    task.add_done_callback(startup_tasks.discard)
+
+@bot.event
+async def setup_hook():
+    # Warm up in the background so the gateway connection isn't held up by Sheets or the PokéAPI.
+    # The first pass of refresh_snapshot is the Sheets warm-up.
+    global metrics_server
+    start_background_task(keep_pokeapi_warm())
+    refresh_snapshot.start()
+    export_metrics.start()
+    if odl_metrics.METRICS_PORT:
+        metrics_server = await odl_metrics.serve_prometheus()
+    # Everything else, like the YouTube poller, shares this process and gateway connection
+    for extension in EXTENSIONS:
+        try:
+            await bot.load_extension(extension)
+        except commands.ExtensionError as e:
+            print(f"Could not load extension {extension}: {e}")
 
 @bot.event
 async def on_ready():
-    global pokemon_names, special_forms, move_names, ability_names, type_names
-
-    # Load data for fuzzy matching
-    pokemon_data = get_pokeapi_data('pokemon?limit=1000')['results']
-    pokemon_names = [p['name'] for p in pokemon_data]
-    move_data = get_pokeapi_data('move?limit=1000')['results']
-    move_names = [m['name'] for m in move_data]
-    ability_data = get_pokeapi_data('ability?limit=1000')['results']
-    ability_names = [a['name'] for a in ability_data]
-    type_data = get_pokeapi_data('type')['results']
-    type_names = [t['name'] for t in type_data]
-    
+    mark_ready('discord')
     print(f'{bot.user.name} has connected to Discord!')
 
-@bot.command(name='type')
+UPSTREAM_NAMES = {'pokeapi': "PokéAPI", 'sheets': "Google Sheets"}
+
+@bot.event
+async def on_command_error(ctx, error):
+    # A failed slash command never runs the after_invoke hook, so it's recorded here
+    record_command(ctx)
+    # Commands, and slash commands even more so, wrap what the callback raised
+    cause = error
+    while hasattr(cause, 'original'):
+        cause = cause.original
+    if isinstance(cause, RateLimited):
+        await ctx.send(f"{UPSTREAM_NAMES.get(cause.name, cause.name)} is busy, try again in {max(1, round(cause.retry_after))}s.")
+        return
+    await commands.Bot.on_command_error(bot, ctx, error)
+
+# Metrics: every command is timed as a whole and per phase (see odl_metrics.timed)
+metrics_server = None  # aiohttp runner serving /metrics when METRICS_PORT is set
+
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.metrics_started = time.perf_counter()
+    ctx.metrics_phases = odl_metrics.start_command()
+    if ctx.interaction is not None:
+        await ctx.defer()  # Slash commands must be acknowledged within 3 seconds
+
+@bot.after_invoke
+async def record_command_timer(ctx):
+    record_command(ctx)
+
+def record_command(ctx):
+    """Records a command's latency and whether it failed, once, from whichever of
+    after_invoke and on_command_error gets to it first."""
+    started = getattr(ctx, 'metrics_started', None)
+    if started is None:
+        return  # Never started (e.g. a failed check) or already recorded
+    del ctx.metrics_started
+    odl_metrics.finish_command(ctx.command.qualified_name, ctx.metrics_phases, time.perf_counter() - started)
+    if ctx.command_failed:
+        odl_metrics.increment('command_errors', command=ctx.command.qualified_name)
+
+@tasks.loop(minutes=1)
+async def export_metrics():
+    try:
+        # Rendered on the event loop, which is the only thing updating the metrics
+        await asyncio.to_thread(odl_metrics.write_prometheus, odl_metrics.render_prometheus())
+    except OSError as e:
+        print(f"Could not write {odl_metrics.METRICS_FILE}: {e}")
+
+@bot.command(name='stats')
+@commands.has_permissions(administrator=True)
+async def stats(ctx):
+    # The digest grows with every command used, so it may take more than one message
+    message = ''
+    for line in odl_metrics.summary_lines():
+        if message and len(message) + 1 + len(line) > DISCORD_MESSAGE_LIMIT:
+            await ctx.send(message)
+            message = ''
+        message = f"{message}\n{line}" if message else line
+    await ctx.send(message)
+
+@stats.error
+async def stats_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("Only server admins can see the bot's stats.")
+    else:
+        raise error
+
+@tasks.loop(minutes=SHEETS_REFRESH_MINUTES)
+async def refresh_snapshot():
+    run_as_background()  # Commands get the Sheets quota first
+    try:
+        await snapshot.refresh()
+    except Exception as e:
+        print(f"Error refreshing sheet snapshot: {e}")
+        ready['sheets'].set()  # Don't keep commands waiting on a failed warm-up, they will retry on demand
+
+@bot.command(name='refresh')
+@commands.has_permissions(administrator=True)
+async def refresh(ctx):
+    try:
+        await snapshot.refresh()
+    except Exception as e:
+        await ctx.send(f"Could not refresh the spreadsheet data: {e}")
+        return
+    if snapshot.stale_since is not None:
+        await ctx.send(f"The spreadsheet is rate limited, still using snapshot v{snapshot.version}.{stale_marker()}")
+        return
+    await ctx.send(f"Spreadsheet data refreshed (snapshot v{snapshot.version}).")
+
+def stale_marker():
+    """Footnote for replies built from a snapshot that could not be refreshed, else ''."""
+    if snapshot.stale_since is None:
+        return ""
+    return f"\n*Stale as of <t:{int(snapshot.fetched_at)}:f>: the spreadsheet could not be refreshed.*"
+
+@refresh.error
+async def refresh_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("Only server admins can refresh the spreadsheet data.")
+    else:
+        raise error
+
+@bot.command(name='reload')
+@commands.has_permissions(administrator=True)
+async def reload(ctx, extension: str = None):
+    """Reloads one extension, or all of them, without dropping the gateway connection.
+
+    An extension that isn't loaded yet is loaded.
+    """
+    names = [extension] if extension else list(bot.extensions)
+    results = []
+    for name in names:
+        try:
+            if name in bot.extensions:
+                await bot.reload_extension(name)
+            else:
+                await bot.load_extension(name)
+            results.append(f"Reloaded {name}.")
+        except commands.ExtensionError as e:
+            results.append(f"Could not reload {name}: {e}")
+    await ctx.send("\n".join(results) or "No extensions are loaded.")
+
+@reload.error
+async def reload_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("Only server admins can reload extensions.")
+    else:
+        raise error
+
+@bot.command(name='sync')
+@commands.has_permissions(administrator=True)
+async def sync(ctx):
+    """Registers the slash commands with Discord. Only needed after they change."""
+    synced = await bot.tree.sync()
+    await ctx.send(f"Synced {len(synced)} slash commands.")
+
+@sync.error
+async def sync_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("Only server admins can sync the slash commands.")
+    else:
+        raise error
+
+# Slash command autocomplete. Suggestions come from the prefix index of each
+# NameMatcher, so answering a keystroke never waits on the network or a sheet.
+def suggest(category, current):
+    matcher = matchers.get(category)
+    if matcher is None:
+        return []
+    return [app_commands.Choice(name=name, value=name) for name in matcher.complete(current)]
+
+def suggest_list(category, current):
+    """Suggestions for a comma-separated list of names: completes the last one, keeping the rest."""
+    done, comma, partial = current.rpartition(',')
+    prefix = f"{done.strip()}, " if comma else ""
+    # Discord rejects choices longer than 100 characters
+    return [app_commands.Choice(name=prefix + c.value, value=prefix + c.value)
+            for c in suggest(category, partial) if len(prefix + c.value) <= 100]
+
+async def pokemon_autocomplete(interaction, current: str):
+    return suggest_list('pokemon', current)
+
+async def move_autocomplete(interaction, current: str):
+    return suggest_list('move', current)
+
+async def ability_autocomplete(interaction, current: str):
+    return suggest('ability', current)
+
+async def item_autocomplete(interaction, current: str):
+    return suggest('item', current)
+
+async def team_autocomplete(interaction, current: str):
+    return suggest('team', current)
+
+async def type_autocomplete(interaction, current: str):
+    # Up to two types separated by a space: complete the one being typed
+    done, _, partial = current.rpartition(' ')
+    if done.strip() and len(done.split()) >= 2:
+        return []
+    prefix = f"{done.strip()} " if done.strip() else ""
+    return [app_commands.Choice(name=prefix + c.value, value=prefix + c.value)
+            for c in suggest('type', partial) if c.value not in NON_BATTLE_TYPES and c.value != done.strip()]
+
+async def week_autocomplete(interaction, current: str):
+    return [app_commands.Choice(name=f"Week {w}", value=w) for w in valid_weeks if str(w).startswith(current.strip())][:25]
+
+# Batched lookups: several comma-separated names answered in one paginated reply
+MAX_BATCH_SIZE = 10  # Names accepted by one !pokemon, !move or !compare
+COMPARE_PAGE_SIZE = 6  # Pokémon per !compare page, two rows of three columns
+STAT_LABELS = {'hp': 'HP', 'attack': 'Atk', 'defense': 'Def', 'special-attack': 'SpA', 'special-defense': 'SpD', 'speed': 'Spe'}
+
+def split_names(text):
+    """Splits a comma-separated list of names, dropping empty entries."""
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+class EmbedPages(discord.ui.View):
+    """Previous/next buttons flipping a single message through a list of embeds."""
+
+    def __init__(self, pages, timeout=300):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.index = 0
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index == len(self.pages) - 1
+
+    async def _show(self, interaction, index):
+        self.index = index
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[index], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.index + 1)
+
+async def send_pages(ctx, pages, content=None):
+    """Sends embeds as one message, with page buttons when there is more than one."""
+    if len(pages) == 1:
+        await ctx.send(content=content, embed=pages[0])
+        return
+    pages = [page.copy() for page in pages]  # Rendered embeds may be cached, don't stamp page numbers on those
+    for number, page in enumerate(pages, 1):
+        page.set_footer(text=f"Page {number} of {len(pages)}")
+    await ctx.send(content=content, embed=pages[0], view=EmbedPages(pages))
+
+async def send_batch(ctx, names, category, render, label):
+    """Corrects a list of names in one pass, renders them concurrently and replies with one paginated embed.
+
+    render takes a corrected name and returns its embed, or None if it doesn't exist.
+    """
+    if len(names) > MAX_BATCH_SIZE:
+        await ctx.send(f"Please ask for at most {MAX_BATCH_SIZE} {label} at a time.")
+        return
+    corrected = list(dict.fromkeys(correct_spelling(n, category).lower().replace(' ', '-') for n in names))
+    embeds = await asyncio.gather(*(render(n) for n in corrected))
+    pages = [embed for embed in embeds if embed]
+    missing = [n for n, embed in zip(corrected, embeds) if not embed]
+    if not pages:
+        await ctx.send(f"None of those {label} were found. Please check the spelling and try again.")
+        return
+    await send_pages(ctx, pages, f"Not found: {', '.join(missing)}" if missing else None)
+
+@bot.hybrid_command(name='type', description="Type matchups for one or two types")
+@app_commands.autocomplete(types=type_autocomplete)
 async def type_info(ctx, *, types: str):
+    await wait_until_ready('pokeapi')
     type_list = types.split()
     if len(type_list) > 2:
         await ctx.send("Please provide one or two types only.")
         return
 
-    type_list = [correct_spelling(t, 'type') for t in type_list]
-    type_data = [get_pokeapi_data(f'type/{t.lower()}') for t in type_list]
-    if None in type_data:
+    # Two names correcting to the same type mean a single type, not a squared dual type
+    type_list = list(dict.fromkeys(correct_spelling(t, 'type').lower() for t in type_list))
+    if not await rendered.send(ctx, 'type', ' '.join(type_list), data_version(), lambda: render_type(type_list)):
         await ctx.send("One of the types provided was not found. Please check the types and try again.")
-        return
 
-    # Prepare the data containers
-    effective_against = [set(), set()]
-    weak_to = [set(), set()]
-    resistant_to = [set(), set()]
-    immune_to = [set(), set()]
+async def render_type(type_list):
+    chart = await get_type_chart()
+    if chart is None or any(t not in chart for t in type_list):
+        return None
+
+    def names(type_names):
+        return ', '.join(type_names).title() or "None"
 
-    # Fill the containers with data from API
-    for i, data in enumerate(type_data):
-        effective_against[i].update([t['name'] for t in data['damage_relations']['double_damage_to']])
-        weak_to[i].update([t['name'] for t in data['damage_relations']['double_damage_from']])
-        resistant_to[i].update([t['name'] for t in data['damage_relations']['half_damage_from']])
-        immune_to[i].update([t['name'] for t in data['damage_relations']['no_damage_from']])
+    defending = chart.defending(type_list)
 
     # Displaying types differently based on the number of types provided
     if len(type_list) == 1:
         # If only one type, simplify the output
+        attacking = chart.attacking(type_list[0])
         embed = discord.Embed(title=f"{type_list[0].title()} Type Interactions", color=discord.Color.blue())
-        embed.add_field(name="Super Effective Against", value=', '.join(effective_against[0]).title() or "None", inline=False)
-        embed.add_field(name="Weak To", value=', '.join(weak_to[0]).title() or "None", inline=False)
-        embed.add_field(name="Resistant To", value=', '.join(resistant_to[0]).title() or "None", inline=False)
-        embed.add_field(name="Immune To", value=', '.join(immune_to[0]).title() or "None", inline=False)
+        embed.add_field(name="Super Effective Against", value=names(chart.names_where(attacking, lambda m: m > 1)), inline=False)
+        embed.add_field(name="Weak To", value=names(chart.names_where(defending, lambda m: m > 1)), inline=False)
+        embed.add_field(name="Resistant To", value=names(chart.names_where(defending, lambda m: (m > 0) & (m < 1))), inline=False)
+        embed.add_field(name="Immune To", value=names(chart.names_where(defending, lambda m: m == 0)), inline=False)
     else:
-        # Calculate combined interactions
-        combined_weak_to = weak_to[0].union(weak_to[1]) - resistant_to[0] - immune_to[0] - resistant_to[1] - immune_to[1]
-        combined_resistant_to = ((resistant_to[0].union(resistant_to[1])) - weak_to[0]) - weak_to[1]
-        combined_immune_to = immune_to[0].union(immune_to[1])
-        x4_weak = weak_to[0].intersection(weak_to[1])
-        x4_resistant = resistant_to[0].intersection(resistant_to[1])
-
+        # Combined interactions are the exact product of both types' multipliers
         embed = discord.Embed(title=f"Type Interactions for {type_list[0].title()} and {type_list[1].title()}", color=discord.Color.blue())
-        embed.add_field(name=f"{type_list[0].title()} is Super Effective Against", value=', '.join(effective_against[0]).title() or "None", inline=False)
-        embed.add_field(name=f"{type_list[1].title()} is Super Effective Against", value=', '.join(effective_against[1]).title() or "None", inline=False)
-        embed.add_field(name="Combined Weak To", value=', '.join(combined_weak_to).title() or "None", inline=False)
-        embed.add_field(name="Combined Resistant To", value=', '.join(combined_resistant_to).title() or "None", inline=False)
-        embed.add_field(name="Combined Immune To", value=', '.join(combined_immune_to).title() or "None", inline=False)
-        embed.add_field(name="4x Weak To", value=', '.join(x4_weak).title() or "None", inline=False)
-        embed.add_field(name="4x Resistant To", value=', '.join(x4_resistant).title() or "None", inline=False)
+        for t in type_list:
+            embed.add_field(name=f"{t.title()} is Super Effective Against", value=names(chart.names_where(chart.attacking(t), lambda m: m > 1)), inline=False)
+        embed.add_field(name="Combined Weak To", value=names(chart.names_where(defending, lambda m: m > 1)), inline=False)
+        embed.add_field(name="Combined Resistant To", value=names(chart.names_where(defending, lambda m: (m > 0) & (m < 1))), inline=False)
+        embed.add_field(name="Combined Immune To", value=names(chart.names_where(defending, lambda m: m == 0)), inline=False)
+        embed.add_field(name="4x Weak To", value=names(chart.names_where(defending, lambda m: m == 4)), inline=False)
+        embed.add_field(name="4x Resistant To", value=names(chart.names_where(defending, lambda m: m == 0.25)), inline=False)
+
+    return {'embed': embed}
+
+@bot.command(name='coverage')
+async def coverage(ctx, *, query: str):
+    await wait_until_ready('pokeapi', 'sheets')
+    chart = await get_type_chart()
+    if chart is None:
+        await ctx.send("Type data is not available right now. Please try again later.")
+        return
+    await snapshot.get('draft')
+    roster = lookup_roster(query)
+    if roster is None:
+        await ctx.send("No team or coach found with that name.")
+        return
+    team_name, coach_name, pokemon = roster
+    pokemon = [(name, [t.lower() for t in types]) for name, types in pokemon]
+    if not pokemon:
+        await ctx.send(f"{team_name} has no Pokémon drafted yet.")
+        return
+
+    # One row per Pokémon, one column per attacking type
+    profile = chart.team_profile([types for _, types in pokemon])
+    weak = (profile > 1).sum(axis=0)
+    resist = ((profile > 0) & (profile < 1)).sum(axis=0)
+    immune = (profile == 0).sum(axis=0)
+    quad = (profile == 4).sum(axis=0)
 
+    lines = []
+    for i, attacker in enumerate(chart.names):
+        line = f"**{attacker.title()}**: {weak[i]} weak"
+        if quad[i]:
+            line += f" ({quad[i]} at 4x)"
+        line += f", {resist[i]} resist, {immune[i]} immune"
+        if weak[i] >= 3 and not resist[i] and not immune[i]:
+            line += " ⚠️"
+        lines.append(line)
+
+    embed = discord.Embed(title=f"Defensive Coverage: {team_name}", description="\n".join(lines), color=discord.Color.blue())
+    embed.set_footer(text=f"Coach: {coach_name} • {len(pokemon)} Pokémon • ⚠️ = 3+ weak with no resist or immunity")
     await ctx.send(embed=embed)
 
-@bot.command(name='pokemon')
+async def get_species_and_chain(species_endpoint):
+    """Fetches a species and, as soon as its URL is known, its evolution chain."""
+    species_data = await get_pokeapi_data(species_endpoint)
+    if not species_data or not species_data.evolution_chain_endpoint:
+        return species_data, None
+    evolution_data = await get_pokeapi_data(species_data.evolution_chain_endpoint)
+    return species_data, evolution_data
+
+@bot.hybrid_command(name='pokemon', description="Types, abilities, stats and evolutions of a Pokémon")
+@app_commands.autocomplete(name=pokemon_autocomplete)
 async def pokemon_info(ctx, *, name: str):
-    name = correct_spelling(name, 'pokemon')
-    data = get_pokeapi_data(f'pokemon/{name.lower()}')
-    if data:
-        # Basic Pokémon information
-        types = [t['type']['name'] for t in data['types']]
-        abilities = [a['ability']['name'] for a in data['abilities']]
-        stats = '\n'.join([f"{s['stat']['name'].title()}: {s['base_stat']}" for s in data['stats']])
-        base_experience = data.get('base_experience', 'N/A')
-        habitat = data.get('habitat', {'name': 'N/A'})['name'] if data.get('habitat') else "N/A"
-
-        # Evolution information (requires fetching from another endpoint)
-        species_url = data['species']['url']
-        species_data = get_pokeapi_data(species_url.replace("https://pokeapi.co/api/v2/", ""))
-        evolution_chain_url = species_data['evolution_chain']['url']
-        evolution_data = get_pokeapi_data(evolution_chain_url.replace("https://pokeapi.co/api/v2/", ""))
-        evolution_details = process_evolution_chain(evolution_data)
-
-        description = f"**{data['name'].title()}**\n"
-        description += f"**Types**: {', '.join(types)}\n"
-        description += f"**Abilities**: {', '.join(abilities)}\n"
-        description += f"**Base Experience**: {base_experience}\n"
+    """Usage: !pokemon <name> or !pokemon <name>, <name>, ..."""
+    await wait_until_ready('pokeapi')
+    names = split_names(name)
+    if len(names) > 1:
+        await send_batch(ctx, names, 'pokemon', render_pokemon, "Pokémon")
+        return
+
+    embed = await render_pokemon(correct_spelling(name, 'pokemon').lower())
+    if embed:
+        await ctx.send(embed=embed)
+    else:
+        await ctx.send("Pokémon not found. Please check the spelling and try again.")
+
+async def render_pokemon(name):
+    """Builds the !pokemon embed for an already corrected name, or returns None if it doesn't exist."""
+    # The species list tells us the species endpoint up front for base forms, so the
+    # species and evolution chain load alongside the Pokémon instead of after it
+    guessed_species = species_endpoints.get(name)
+    species_task = asyncio.create_task(get_species_and_chain(guessed_species)) if guessed_species else None
+    try:
+        data = await get_pokeapi_data(f'pokemon/{name}')
+    except RateLimited:
+        if species_task:
+            species_task.cancel()
+        raise
+    if not data:
+        if species_task:
+            species_task.cancel()
+        return None
+    if data.species_endpoint != guessed_species:
+        if species_task:
+            species_task.cancel()
+        species_task = asyncio.create_task(get_species_and_chain(data.species_endpoint))
+
+    # Basic Pokémon information
+    stats = '\n'.join([f"{stat.title()}: {base}" for stat, base in data.stats])
+
+    # Evolution information comes from the species' evolution chain
+    species_data, evolution_data = await species_task
+    with timed('render'):
+        habitat = species_data.habitat if species_data and species_data.habitat else "N/A"
+        evolution_details = process_evolution_chain(evolution_data) if evolution_data else "N/A"
+
+        description = f"**{data.name.title()}**\n"
+        description += f"**Types**: {', '.join(data.types)}\n"
+        description += f"**Abilities**: {', '.join(data.abilities)}\n"
+        description += f"**Base Experience**: {data.base_experience}\n"
         description += f"**Habitat**: {habitat}\n"
         description += f"**Stats**:\n{stats}\n"
         description += f"**Evolution Details**:\n{evolution_details}"
 
         embed = discord.Embed(description=description, color=discord.Color.green())
-        embed.set_thumbnail(url=data['sprites']['front_default'])
-        await ctx.send(embed=embed)
-    else:
-        await ctx.send("Pokémon not found. Please check the spelling and try again.")
+        embed.set_thumbnail(url=data.sprite)
+    return embed
+
+@bot.hybrid_command(name='compare', description="Base stats of several Pokémon side by side")
+@app_commands.autocomplete(names=pokemon_autocomplete)
+async def compare(ctx, *, names: str):
+    """Usage: !compare <name>, <name>, ..."""
+    await wait_until_ready('pokeapi')
+    requested = split_names(names)
+    if len(requested) < 2:
+        await ctx.send("Usage: !compare <pokemon>, <pokemon>, ...")
+        return
+    if len(requested) > MAX_BATCH_SIZE:
+        await ctx.send(f"Please compare at most {MAX_BATCH_SIZE} Pokémon at a time.")
+        return
+
+    corrected = list(dict.fromkeys(correct_spelling(n, 'pokemon').lower().replace(' ', '-') for n in requested))
+    records = await asyncio.gather(*(get_pokeapi_data(f'pokemon/{n}') for n in corrected))
+    found = [r for r in records if r]
+    missing = [n for n, r in zip(corrected, records) if not r]
+    if not found:
+        await ctx.send("None of those Pokémon were found. Please check the spelling and try again.")
+        return
+    with timed('render'):
+        pages = render_comparison(found)
+    await send_pages(ctx, pages, f"Not found: {', '.join(missing)}" if missing else None)
+
+def render_comparison(records):
+    """Lays out base stats in side-by-side columns, COMPARE_PAGE_SIZE Pokémon per page, best values in bold."""
+    stats = [dict(r.stats) for r in records]
+    totals = [sum(s.values()) for s in stats]
+    best = {stat: max(s.get(stat, 0) for s in stats) for stat in STAT_LABELS}
+    best_total = max(totals)
+    pages = []
+    for start in range(0, len(records), COMPARE_PAGE_SIZE):
+        embed = discord.Embed(title="Base Stats", color=discord.Color.green())
+        for record, record_stats, total in zip(records[start:start + COMPARE_PAGE_SIZE], stats[start:], totals[start:]):
+            lines = []
+            for stat, label in STAT_LABELS.items():
+                value = record_stats.get(stat, 0)
+                lines.append(f"{label}: **{value}**" if value == best[stat] else f"{label}: {value}")
+            lines.append(f"Total: **{total}**" if total == best_total else f"Total: {total}")
+            embed.add_field(name=f"{record.name.title()} ({'/'.join(t.title() for t in record.types)})", value="\n".join(lines), inline=True)
+        pages.append(embed)
+    return pages
+
+def describe_evolution(details_list):
+    """Describes the ways to evolve into a species, e.g. "Level 16" or "Use water-stone"."""
+    conditions = []
+    for details in details_list:
+        trigger = details['trigger']['name']
+
+        if trigger == 'level-up':
+            level = details.get('min_level')
+            condition = f"Level {level}" if level else "Level up"
+            if details.get('time_of_day'):
+                condition += f" during {details['time_of_day']} time"
+            if details.get('held_item'):
+                item = details['held_item']['name']
+                condition += f" while holding {item}"
+            if details.get('location'):
+                location = details['location']['name']
+                condition += f" at {location}"
+            if details.get('gender'):
+                condition += f" if gender is {details['gender']}"
+            if details.get('min_happiness'):
+                condition += f" with high friendship ({details['min_happiness']})"
+            conditions.append(condition)
+
+        elif trigger == 'use-item':
+            item = details['item']['name']
+            conditions.append(f"Use {item}")
+
+        elif trigger == 'trade':
+            if details.get('held_item'):
+                item = details['held_item']['name']
+                conditions.append(f"Trade while holding {item}")
+            else:
+                conditions.append("Trade")
+
+        elif trigger == 'other':
+            conditions.append("Special condition")  # Can be detailed further as needed
+
+        elif trigger == 'friendship':
+            condition = "With high friendship"
+            if details.get('time_of_day'):
+                condition += f" during {details['time_of_day']} time"
+            conditions.append(condition)
+
+    return " or ".join(conditions)
+
+evolution_texts = {}  # Evolution chain id -> rendered text, shared by every member of the family
 
 def process_evolution_chain(data):
-    """Processes the evolution chain data to format it as a readable string."""
-    evolution_chain = ""
-    current = data['chain']
-    while current:
-        species_name = current['species']['name'].title()  # Capitalize the Pokémon name
-        if current['evolves_to']:
-            details_list = current['evolves_to'][0]['evolution_details']
-            conditions = []
-            for details in details_list:
-                trigger = details['trigger']['name']
-
-                if trigger == 'level-up':
-                    level = details.get('min_level')
-                    condition = f"Level {level}" if level else "Level up"
-                    if details.get('time_of_day'):
-                        condition += f" during {details['time_of_day']} time"
-                    if details.get('held_item'):
-                        item = details['held_item']['name']
-                        condition += f" while holding {item}"
-                    if details.get('location'):
-                        location = details['location']['name']
-                        condition += f" at {location}"
-                    if details.get('gender'):
-                        condition += f" if gender is {details['gender']}"
-                    if details.get('min_happiness'):
-                        condition += f" with high friendship ({details['min_happiness']})"
-                    conditions.append(condition)
-
-                elif trigger == 'use-item':
-                    item = details['item']['name']
-                    conditions.append(f"Use {item}")
-
-                elif trigger == 'trade':
-                    if details.get('held_item'):
-                        item = details['held_item']['name']
-                        conditions.append(f"Trade while holding {item}")
-                    else:
-                        conditions.append("Trade")
-
-                elif trigger == 'other':
-                    conditions.append("Special condition")  # Can be detailed further as needed
-
-                elif trigger == 'friendship':
-                    condition = "With high friendship"
-                    if details.get('time_of_day'):
-                        condition += f" during {details['time_of_day']} time"
-                    conditions.append(condition)
-
-            evolution_details = " or ".join(conditions)
-            evolution_chain += f"{species_name} -> ({evolution_details}) "
-        else:
-            evolution_chain += species_name
-            break
-        current = current['evolves_to'][0]
-    return evolution_chain
+    """Processes the evolution chain data to format it as a readable string.
+
+    Every branch is included, one line per final evolution, e.g. one line per
+    Eeveelution. The text is rendered once per chain and then reused.
+    """
+    if data['id'] in evolution_texts:
+        return evolution_texts[data['id']]
+
+    lines = []
+    def walk(node, prefix):
+        species_name = node['species']['name'].title()  # Capitalize the Pokémon name
+        if not node['evolves_to']:
+            lines.append(prefix + species_name)
+        for evolution in node['evolves_to']:
+            walk(evolution, f"{prefix}{species_name} -> ({describe_evolution(evolution['evolution_details'])}) ")
+    walk(data['chain'], "")
+
+    evolution_texts[data['id']] = "\n".join(lines)
+    return evolution_texts[data['id']]
 
 @bot.command(name='standings')
 async def standings(ctx):
-    all_values = sheet.get_all_values()
+    await wait_until_ready('sheets')
+    await snapshot.get('standings')
+    await rendered.send(ctx, 'standings', '', (snapshot.version, stale_marker()), render_standings)
+
+async def render_standings():
+    all_values = await snapshot.get('standings')
     data_rows = all_values[3:]  # This skips the first three rows which are assumed to be headers or empty
-    response = "**Standings:**\n"
+    lines = ["**Standings:**"]
     for row in data_rows:
         if all(cell.strip() == '' for cell in row):
             continue
@@ -273,101 +859,110 @@ async def standings(ctx):
         team_name = row[4]
         coach_name = row[5]
         record = row[6]
-        response += f"{rank}: {team_name} - {coach_name}, {record}\n"
-    await ctx.send(response)
+        lines.append(f"{rank}: {team_name} - {coach_name}, {record}")
+    return {'content': "\n".join(lines) + stale_marker() + "\n"}
 
 @bot.command(name='mvp')
-async def mvp(ctx):
-    mvp_sheet = client.open("Oshawott Draft League").worksheet('MVP Race')
-    all_values = mvp_sheet.get_all_values()
-    data_rows = all_values[3:]  # Assumes the first three rows are headers or empty
-    response = "**MVP Race - Top 15:**\n"
+async def mvp(ctx, *, options: str = ''):
+    """Usage: !mvp [kills|diff] [page N] or !mvp coach <name>"""
+    await wait_until_ready('sheets')
+    await snapshot.get('mvp')
 
-    try:
-        # Sorting rows by the 'Rank' column (assuming it's the third column, index 2)
-        sorted_rows = sorted(data_rows, key=lambda x: int(x[2].strip('#') or 0))
-    except IndexError as e:
-        await ctx.send("Error processing data: " + str(e))
-        return
-    except ValueError as e:
-        await ctx.send("Error processing rank data: " + str(e))
-        return
+    words = options.split()
+    sort, page, coach = 'rank', 1, None
+    if words and words[0].lower() == 'coach':
+        coach = ' '.join(words[1:])
+        if not coach:
+            await ctx.send("Usage: !mvp coach <name>")
+            return
+        coach = lookup_mvp_coach(coach)
+    else:
+        while words:
+            word = words.pop(0).lower()
+            if word in MVP_SORT_KEYS:
+                sort = word
+            elif word == 'page' and words and words[0].isdigit():
+                page = max(1, int(words.pop(0)))
+            else:
+                await ctx.send("Usage: !mvp [kills|diff] [page N] or !mvp coach <name>")
+                return
 
-    for row in sorted_rows[:16]:  # Only include the top 15
-        if all(cell.strip() == '' for cell in row):
-            continue
-        rank = row[2].strip('#')
-        pokemon = row[4]
-        coach_name = row[5]
-        kills = row[7]
-        deaths = row[8]
-        diff = row[9]
-        response += f"{rank}: {pokemon} - {coach_name}, Kills: {kills}, Deaths: {deaths}, Diff: {diff}\n"
+    if coach is not None:
+        rows = mvp_top(len(mvp_entries), sort, coach)
+        if not rows:
+            await ctx.send("No MVP Race entries found for that coach.")
+            return
+        response = f"**MVP Race - {rows[0].coach_name}:**\n"
+    else:
+        pages = max(1, -(-len(mvp_entries) // MVP_PAGE_SIZE))
+        page = min(page, pages)
+        rows = mvp_top(page * MVP_PAGE_SIZE, sort)[(page - 1) * MVP_PAGE_SIZE:]
+        if page == 1 and sort == 'rank':
+            response = f"**MVP Race - Top {MVP_PAGE_SIZE}:**\n"
+        else:
+            response = f"**MVP Race - Page {page} of {pages}" + (f" (by {sort})" if sort != 'rank' else "") + ":**\n"
 
-    await ctx.send(response)
+    response += "".join(f"{e.rank}: {e.pokemon} - {e.coach_name}, Kills: {e.kills}, Deaths: {e.deaths}, Diff: {e.diff}\n" for e in rows)
+    await ctx.send(response + stale_marker())
 
-@bot.command(name='team')
+@bot.hybrid_command(name='team', description="A team's roster, by team or coach name")
+@app_commands.autocomplete(query=team_autocomplete)
 async def team(ctx, *, query: str):
-    query = correct_spelling(query, 'pokemon')
-    draft_sheet = client.open("Oshawott Draft League").worksheet('Draft But Simple')
-    draft_values = draft_sheet.get_all_values()
-    query_lower = query.lower()
-    response = ""
-    found = False
-
-    for index, col in enumerate(draft_values[0]):
-        if col.lower() == query_lower or (draft_values[1][index].lower() == query_lower if len(draft_values) > 1 else False):
-            team_name = col
-            coach_name = draft_values[1][index] if len(draft_values) > 1 else "Not specified"
-            pokemon_formatted = []
-
-            for i in range(2, len(draft_values)):
-                if index < len(draft_values[i]):
-                    pokemon_name = draft_values[i][index]
-                    types = draft_values[i][index+1:index+4]
-                    types = [t.strip() for t in types if t.strip()]
-                    pokemon_info = f"{pokemon_name} - {', '.join(types)}" if types else pokemon_name
-                    pokemon_formatted.append(pokemon_info)
-
-            response = f"**Team Name:** {team_name}\n**Coach Name:** {coach_name}\n**Pokémon:**\n - " + "\n - ".join(pokemon_formatted)
-            found = True
-            break
-
-    if found:
-        await ctx.send(response)
+    await wait_until_ready('sheets')
+    await snapshot.get('draft')
+    roster = lookup_roster(query)
+
+    if roster:
+        pokemon_formatted = [f"{name} - {', '.join(types)}" if types else name for name, types in roster.pokemon]
+        response = f"**Team Name:** {roster.team_name}\n**Coach Name:** {roster.coach_name}\n**Pokémon:**\n - " + "\n - ".join(pokemon_formatted)
+        await ctx.send(response + stale_marker())
     else:
         await ctx.send("No team or coach found with that name.")
 
-@bot.command(name='week')
+@bot.command(name='owner')
+async def owner(ctx, *, pokemon: str):
+    await wait_until_ready('pokeapi', 'sheets')
+    await snapshot.get('draft')
+    # Try the names as written on the draft board first, then the PokéAPI spelling
+    owners = owner_index.get(normalize(correct_spelling(pokemon, 'drafted')))
+    if owners is None:
+        owners = owner_index.get(normalize(correct_spelling(pokemon, 'pokemon')))
+
+    if owners:
+        response = "\n".join(f"**{name}** was drafted by **{roster.team_name}** (Coach: {roster.coach_name})" for name, roster in owners)
+        await ctx.send(response + stale_marker())
+    else:
+        await ctx.send(f"Nobody has drafted {pokemon}.")
+
+@bot.hybrid_command(name='week', description="The matchups of one week")
+@app_commands.autocomplete(week_number=week_autocomplete)
 async def week(ctx, week_number: int):
+    await wait_until_ready('sheets')
     if week_number in week_matchups:
-        matchups = week_matchups[week_number]
-        # Convert team identifiers to names and avoid duplicates
-        seen_matchups = set()
-        formatted_matchups = []
-        for match in matchups:
-            if match not in seen_matchups and (match[1], match[0]) not in seen_matchups:
-                seen_matchups.add(match)
-                formatted_matchups.append(f"{teams[match[0]]} vs {teams[match[1]]}")
-        response = f"**Matchups for Week {week_number}:**\n" + "\n".join(formatted_matchups)
+        response = f"**Matchups for Week {week_number}:**\n" + "\n".join(week_matchups[week_number]) + stale_marker()
+    elif valid_weeks:
+        response = f"Invalid week number. Please enter a number between {valid_weeks.start} and {valid_weeks.stop - 1}."
     else:
-        response = "Invalid week number. Please enter a number between 1 and 7."
-    
+        response = "The schedule hasn't been loaded yet. Please try again in a moment."
+
     await ctx.send(response)
 
 @bot.command(name='tera')
 async def tera(ctx):
-    # Fetch the data from the "Rules" sheet, ranges C11:C16 and D11:D16
-    rules_sheet = client.open("Oshawott Draft League").worksheet('Rules')
-    tera_numbers = rules_sheet.get('C11:C16')
-    tera_rules = rules_sheet.get('D11:D16')
+    await wait_until_ready('sheets')
+    await snapshot.get('rules')
+    await rendered.send(ctx, 'tera', '', (snapshot.version, stale_marker()), render_tera)
+
+async def render_tera():
+    # Rules!C11:D16 from the snapshot: rule number in C, rule text in D
+    tera_rows = await snapshot.get('rules')
 
     # Prepare the response message
-    response = "**Terastalisation Rules**\n"
-    for number, rule in zip(tera_numbers, tera_rules):
-        response += f"{number[0]} {rule[0]}\n"
-    
-    await ctx.send(response)
+    lines = ["**Terastalisation Rules**"]
+    for row in tera_rows:
+        number, rule = (row + ['', ''])[:2]
+        lines.append(f"{number} {rule}")
+    return {'content': "\n".join(lines) + stale_marker() + "\n"}
 
 @bot.command(name='banned')
 async def banned(ctx):
@@ -408,67 +1003,79 @@ async def banned(ctx):
     
     await ctx.send(response)
 
-@bot.command(name='ability')
+@bot.hybrid_command(name='ability', description="What an ability does")
+@app_commands.autocomplete(ability_name=ability_autocomplete)
 async def ability_info(ctx, *, ability_name: str):
-    ability_name = correct_spelling(ability_name, 'ability')
-    data = get_pokeapi_data(f'ability/{ability_name.lower().replace(" ", "-")}')
-    if data:
-        name = data['name'].replace('-', ' ').title()
-        effect_entries = data['effect_entries']
-        effect = next((entry['effect'] for entry in effect_entries if entry['language']['name'] == 'en'), "No description available.")
-        short_effect = next((entry['short_effect'] for entry in effect_entries if entry['language']['name'] == 'en'), "No description available.")
-
-        embed = discord.Embed(title=f"Ability: {name}", description=f"**Effect**: {effect}\n**Short Effect**: {short_effect}", color=discord.Color.dark_blue())
-        await ctx.send(embed=embed)
-    else:
+    await wait_until_ready('pokeapi')
+    ability_name = correct_spelling(ability_name, 'ability').lower().replace(" ", "-")
+    if not await rendered.send(ctx, 'ability', ability_name, data_version(), lambda: render_ability(ability_name)):
         await ctx.send("Ability not found. Please check the spelling and try again.")
 
-@bot.command(name='move')
+async def render_ability(ability_name):
+    data = await get_pokeapi_data(f'ability/{ability_name}')
+    if not data:
+        return None
+    name = data.name.replace('-', ' ').title()
+    embed = discord.Embed(title=f"Ability: {name}", description=f"**Effect**: {data.effect}\n**Short Effect**: {data.short_effect}", color=discord.Color.dark_blue())
+    return {'embed': embed}
+
+@bot.hybrid_command(name='move', description="Type, power, PP, accuracy and effect of a move")
+@app_commands.autocomplete(move_name=move_autocomplete)
 async def move_info(ctx, *, move_name: str):
-    move_name = correct_spelling(move_name, 'move')
-    data = get_pokeapi_data(f'move/{move_name.lower().replace(" ", "-")}')
-    if data:
-        name = data['name'].replace('-', ' ').title()
-        power = data['power'] if data['power'] else "N/A"
-        pp = data['pp']
-        accuracy = data['accuracy'] if data['accuracy'] else "N/A"
-        move_type = data['type']['name'].title()
-        effect_entries = data['effect_entries']
-        effect = next((entry['effect'] for entry in effect_entries if entry['language']['name'] == 'en'), "No description available.")
-        short_effect = next((entry['short_effect'] for entry in effect_entries if entry['language']['name'] == 'en'), "No description available.")
-
-        embed = discord.Embed(title=f"Move: {name}", color=discord.Color.orange())
-        embed.add_field(name="Type", value=move_type, inline=True)
-        embed.add_field(name="Power", value=power, inline=True)
-        embed.add_field(name="PP", value=pp, inline=True)
-        embed.add_field(name="Accuracy", value=accuracy, inline=True)
-        embed.add_field(name="Effect", value=effect, inline=False)
-        embed.add_field(name="Short Effect", value=short_effect, inline=False)
-        await ctx.send(embed=embed)
-    else:
+    """Usage: !move <name> or !move <name>, <name>, ..."""
+    await wait_until_ready('pokeapi')
+    names = split_names(move_name)
+    if len(names) > 1:
+        await send_batch(ctx, names, 'move', move_embed, "moves")
+        return
+    move_name = correct_spelling(move_name, 'move').lower().replace(" ", "-")
+    if not await rendered.send(ctx, 'move', move_name, data_version(), lambda: render_move(move_name)):
         await ctx.send("Move not found. Please check the spelling and try again.")
 
-@bot.command(name='item')
+async def move_embed(move_name):
+    response = await rendered.render('move', move_name, data_version(), lambda: render_move(move_name))
+    return response['embed'] if response else None
+
+async def render_move(move_name):
+    data = await get_pokeapi_data(f'move/{move_name}')
+    if not data:
+        return None
+    name = data.name.replace('-', ' ').title()
+    power = data.power if data.power else "N/A"
+    accuracy = data.accuracy if data.accuracy else "N/A"
+    move_type = data.type.title()
+
+    embed = discord.Embed(title=f"Move: {name}", color=discord.Color.orange())
+    embed.add_field(name="Type", value=move_type, inline=True)
+    embed.add_field(name="Power", value=power, inline=True)
+    embed.add_field(name="PP", value=data.pp, inline=True)
+    embed.add_field(name="Accuracy", value=accuracy, inline=True)
+    embed.add_field(name="Effect", value=data.effect, inline=False)
+    embed.add_field(name="Short Effect", value=data.short_effect, inline=False)
+    return {'embed': embed}
+
+@bot.hybrid_command(name='item', description="What an item does")
+@app_commands.autocomplete(item_name=item_autocomplete)
 async def item_info(ctx, *, item_name: str):
-    item_name = correct_spelling(item_name, 'item')
-    data = get_pokeapi_data(f'item/{item_name.lower().replace(" ", "-")}')
-    if data:
-        name = data['name'].replace('-', ' ').title()
-        category = data['category']['name'].replace('-', ' ').title()
-        cost = data['cost']
-        effect_entries = data['effect_entries']
-        effect = next((entry['effect'] for entry in effect_entries if entry['language']['name'] == 'en'), "No description available.")
-        short_effect = next((entry['short_effect'] for entry in effect_entries if entry['language']['name'] == 'en'), "No description available.")
-
-        embed = discord.Embed(title=f"Item: {name}", color=discord.Color.purple())
-        embed.add_field(name="Category", value=category, inline=True)
-        embed.add_field(name="Cost", value=cost, inline=True)
-        embed.add_field(name="Effect", value=effect, inline=False)
-        embed.add_field(name="Short Effect", value=short_effect, inline=False)
-        await ctx.send(embed=embed)
-    else:
+    await wait_until_ready('pokeapi')
+    item_name = correct_spelling(item_name, 'item').lower().replace(" ", "-")
+    if not await rendered.send(ctx, 'item', item_name, data_version(), lambda: render_item(item_name)):
         await ctx.send("Item not found. Please check the spelling and try again.")
 
+async def render_item(item_name):
+    data = await get_pokeapi_data(f'item/{item_name}')
+    if not data:
+        return None
+    name = data.name.replace('-', ' ').title()
+    category = data.category.replace('-', ' ').title()
+
+    embed = discord.Embed(title=f"Item: {name}", color=discord.Color.purple())
+    embed.add_field(name="Category", value=category, inline=True)
+    embed.add_field(name="Cost", value=data.cost, inline=True)
+    embed.add_field(name="Effect", value=data.effect, inline=False)
+    embed.add_field(name="Short Effect", value=data.short_effect, inline=False)
+    return {'embed': embed}
+
 @bot.command(name='avatar')
 async def avatar(ctx, *, member: discord.Member = None):
     member = member or ctx.author  # if no member is specified, use the message author
@@ -481,5 +1088,14 @@ async def avatar(ctx, *, member: discord.Member = None):
 async def ping(ctx):
     await ctx.send('Pong!')
 
+async def main():
+    try:
+        async with bot:
+            await bot.start(DISCORD_TOKEN)
+    finally:
+        if metrics_server is not None:
+            await metrics_server.cleanup()
+        await close_session()
+
 if __name__ == '__main__':
-    bot.run(DISCORD_TOKEN)
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from thefuzz import fuzz, process, utils  # Fuzzy string matching
+
+# Variables
+MATCH_THRESHOLD = 70  # Corrections scoring at or below this are ignored
+SHORTLIST_SIZE = 80  # Candidates scored in full after the trigram lookup
+CORRECTION_CACHE_SIZE = 2048
+MAX_SUGGESTIONS = 25  # Discord shows at most 25 autocomplete choices
+
+def normalize(name):
+    """Lowercases a name and turns punctuation into spaces, the same way thefuzz does."""
+    return utils.full_process(name)
+
+def trigrams(text):
+    """Returns the set of character trigrams of a normalized name, padded so short names still index."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class PrefixIndex:
+    """Sorted index of normalized names for prefix lookups, used by autocomplete.
+
+    Every word of a name is indexed as well as the whole name, so "galar"
+    finds "meowth-galar". A lookup is a binary search plus a short scan, no
+    fuzzy scoring.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        keys = set()
+        for i, name in enumerate(self.names):
+            norm = normalize(name)
+            words = norm.split()
+            for start in range(len(words)):
+                keys.add((' '.join(words[start:]), start, i))
+        self._keys = sorted(keys)
+
+    def complete(self, prefix, limit=MAX_SUGGESTIONS):
+        """Returns up to limit names starting with prefix, whole-name matches first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return self.names[:limit]
+        whole, inner = [], []
+        for key, start, i in self._keys[bisect_left(self._keys, (prefix,)):]:
+            if not key.startswith(prefix):
+                break
+            (inner if start else whole).append(i)
+            if len(whole) >= limit:
+                break
+        found = list(dict.fromkeys(whole + inner))
+        return [self.names[i] for i in found[:limit]]
+
+class NameMatcher:
+    """Fuzzy spelling correction over one fixed list of names.
+
+    The names are indexed by character trigrams once, so a lookup only runs
+    fuzz.ratio over the few candidates sharing the most trigrams with the query
+    instead of over the whole list. Corrections are cached by normalized query.
+    """
+
+    def __init__(self, names, threshold=MATCH_THRESHOLD, shortlist_size=SHORTLIST_SIZE, cache_size=CORRECTION_CACHE_SIZE):
+        self.names = list(dict.fromkeys(names))  # Drop duplicates but keep the original order
+        self.threshold = threshold
+        self.shortlist_size = shortlist_size
+        self.cache_size = cache_size
+        self._normalized = [normalize(n) for n in self.names]
+        self._exact = {}
+        self._index = {}  # trigram -> indexes of the names containing it
+        for i, norm in enumerate(self._normalized):
+            self._exact.setdefault(norm, i)
+            for gram in trigrams(norm):
+                self._index.setdefault(gram, []).append(i)
+        self._cache = OrderedDict()
+        self.prefixes = PrefixIndex(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def shortlist(self, query):
+        """Returns the indexes of the names most likely to match a normalized query."""
+        shared = Counter()
+        for gram in trigrams(query):
+            shared.update(self._index.get(gram, ()))
+        return [i for i, _ in shared.most_common(self.shortlist_size)]
+
+    def best_match(self, name):
+        """Returns (match, score) for the best candidate, or (None, 0) if nothing shares a trigram."""
+        query = normalize(name)
+        if query in self._exact:
+            return self.names[self._exact[query]], 100
+        candidates = {i: self._normalized[i] for i in sorted(self.shortlist(query))}  # Sorted so ties resolve like extractOne
+        result = process.extractOne(query, candidates, processor=None, scorer=fuzz.ratio)
+        if result is None:
+            return None, 0
+        _, score, best = result
+        return self.names[best], score
+
+    def complete(self, prefix, limit=MAX_SUGGESTIONS):
+        """Autocomplete suggestions for a partly typed name."""
+        return self.prefixes.complete(prefix, limit)
+
+    def correct(self, name):
+        """Returns the closest known name, or name unchanged if nothing scores above the threshold."""
+        key = normalize(name)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            match = self._cache[key]
+        else:
+            match, score = self.best_match(name)
+            if score <= self.threshold:
+                match = None
+            self._cache[key] = match
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return match if match is not None else name
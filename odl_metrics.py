@@ -0,0 +1,175 @@
+import os
+import time
+import bisect
+import contextvars
+from contextlib import contextmanager
+from aiohttp import web
+from odl_upstream import buckets, flights, coalescing_stats
+
+# Variables
+METRICS_FILE = os.getenv('METRICS_FILE', 'odl_metrics.prom')  # Prometheus text file, e.g. for node_exporter's textfile collector
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Also serve /metrics on this local port when set
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # Seconds
+
+class Histogram:
+    """Cumulative-bucket latency histogram, the way Prometheus exposes them."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Estimates a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+histograms = {}  # (command, phase) -> Histogram
+counters = {}  # (name, sorted label items) -> value
+
+def increment(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    counters[key] = counters.get(key, 0) + amount
+
+def counter(name, **labels):
+    return counters.get((name, tuple(sorted(labels.items()))), 0)
+
+# Per-command phase timing. A command sets a fresh dict when it starts; timed()
+# blocks anywhere below it (including tasks it starts) add their time to it.
+command_phases = contextvars.ContextVar('command_phases', default=None)
+active_phase = contextvars.ContextVar('active_phase', default=None)
+
+def start_command():
+    phases = {}
+    command_phases.set(phases)
+    return phases
+
+@contextmanager
+def timed(phase):
+    """Adds the time spent in the block to phase of the running command, if any.
+
+    Overlapping blocks (e.g. fetches run with gather) are all counted, so a
+    phase is time spent in it rather than wall-clock time. A phase nested in
+    another one (a fetch while rendering) only counts towards the inner one.
+    """
+    phases = command_phases.get()
+    if phases is None:
+        yield
+        return
+    outer = active_phase.get()
+    token = active_phase.set(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        active_phase.reset(token)
+        phases[phase] = phases.get(phase, 0.0) + elapsed
+        if outer is not None and outer != phase:
+            phases[outer] = phases.get(outer, 0.0) - elapsed
+
+def finish_command(command, phases, total):
+    """Records one invocation: its total latency and the time spent in each phase."""
+    histograms.setdefault((command, 'total'), Histogram()).observe(total)
+    for phase, seconds in phases.items():
+        histograms.setdefault((command, phase), Histogram()).observe(max(seconds, 0.0))
+
+def hit_rate(cache):
+    hits, misses = counter('cache_requests', cache=cache, result='hit'), counter('cache_requests', cache=cache, result='miss')
+    return hits, misses, hits / (hits + misses) if hits + misses else 0.0
+
+def summary_lines():
+    """Human-readable digest of the metrics, for !stats."""
+    def ms(seconds):
+        return f"{seconds * 1000:.0f} ms" if seconds != float('inf') else "> 30 s"
+
+    lines = ["**Command latency** (p50 / p99)"]
+    for (command, phase), total in sorted(histograms.items()):
+        if phase != 'total':
+            continue
+        parts = [f"{name} {ms(histograms[(command, name)].quantile(0.5))}"
+                 for name in ('match', 'fetch', 'render') if (command, name) in histograms]
+        lines.append(f"!{command}: {total.count} calls, {ms(total.quantile(0.5))} / {ms(total.quantile(0.99))}"
+                     + (f" ({', '.join(parts)})" if parts else ""))
+    caches = sorted({dict(labels)['cache'] for name, labels in counters if name == 'cache_requests'})
+    if caches:
+        lines.append("**Cache hit rates**")
+        for cache in caches:
+            hits, misses, rate = hit_rate(cache)
+            lines.append(f"{cache}: {rate:.0%} of {hits + misses}")
+    upstreams = sorted({dict(labels)['upstream'] for name, labels in counters if name == 'upstream_calls'} | set(buckets))
+    if upstreams:
+        lines.append("**Upstream calls**")
+        for upstream in upstreams:
+            calls = sum(v for (name, labels), v in counters.items() if name == 'upstream_calls' and dict(labels)['upstream'] == upstream)
+            errors = counter('upstream_calls', upstream=upstream, outcome='error')
+            limited = buckets[upstream].limited if upstream in buckets else 0
+            lines.append(f"{upstream}: {calls} calls, {errors} errors ({errors / calls if calls else 0:.1%}), {limited} rate limited")
+    coalescing = {name: stats for name, stats in sorted(coalescing_stats().items()) if stats[0]}
+    if coalescing:
+        lines.append("**Coalesced requests**")
+        lines += [f"{name}: {coalesced} of {calls} ({coalesced / calls:.0%})" for name, (calls, coalesced) in coalescing.items()]
+    lines.append(f"**YouTube quota**: {counter('youtube_quota_units')} units since startup")
+    return lines
+
+def format_labels(labels):
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}' if labels else ''
+
+def render_prometheus():
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = ['# TYPE odl_command_seconds histogram']
+    for (command, phase), histogram in sorted(histograms.items()):
+        labels = [('command', command), ('phase', phase)]
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'odl_command_seconds_bucket{format_labels(labels + [("le", le)])} {cumulative}')
+        lines.append(f'odl_command_seconds_sum{format_labels(labels)} {histogram.sum}')
+        lines.append(f'odl_command_seconds_count{format_labels(labels)} {histogram.count}')
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f'# TYPE odl_{name}_total counter')
+        for (other, labels), value in sorted(counters.items()):
+            if other == name:
+                lines.append(f'odl_{name}_total{format_labels(labels)} {value}')
+
+    # Counters kept by the upstream helpers themselves
+    lines.append('# TYPE odl_rate_limited_total counter')
+    lines += [f'odl_rate_limited_total{{upstream="{name}"}} {bucket.limited}' for name, bucket in sorted(buckets.items())]
+    lines.append('# TYPE odl_coalesced_total counter')
+    lines += [f'odl_coalesced_total{{flight="{name}"}} {flight.coalesced}' for name, flight in sorted(flights.items())]
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(text, path=METRICS_FILE):
+    """Writes text from render_prometheus(). Blocking, but doesn't touch the metrics, so it can run in a thread."""
+    # Write to a temporary file first so a scraper never reads half a file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+
+async def serve_prometheus(port=METRICS_PORT):
+    """Serves /metrics on localhost. Returns the aiohttp runner, to clean up on shutdown."""
+    async def handle(request):
+        return web.Response(text=render_prometheus(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
@@ -0,0 +1,668 @@
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import asyncio
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+import aiohttp
+from odl_upstream import SingleFlight, TokenBucket, RateLimited, run_as_background
+from odl_metrics import increment, timed
+
+# Variables
+POKEAPI_BASE_URL = os.getenv('POKEAPI_BASE_URL', 'https://pokeapi.co/api/v2/')
+POKEAPI_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+POKEAPI_MAX_CONNECTIONS = 10  # Keep-alive connections kept open to pokeapi.co
+POKEAPI_RETRIES = 3
+POKEAPI_BACKOFF = 0.5  # Seconds, doubled after every failed attempt
+POKEAPI_REQUESTS_PER_SECOND = float(os.getenv('POKEAPI_REQUESTS_PER_SECOND', 20))  # Fair use, shared by every caller
+
+# Persistent cache settings
+CACHE_FILE = os.getenv('POKEAPI_CACHE_FILE', 'pokeapi_cache.sqlite3')
+CACHE_TTL = 30 * 24 * 3600  # Species, moves, items etc. practically never change
+LIST_CACHE_TTL = 24 * 3600  # Name lists pick up new Pokémon/moves within a day
+NEGATIVE_CACHE_TTL = 15 * 60  # Misspelled names are retried after 15 minutes
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # Compressed bytes kept on disk
+MEMORY_CACHE_SIZE = 4096  # Entries kept decoded in memory; most are small projected records
+CACHE_ROW_OVERHEAD = 128  # Bytes counted per row on top of its body, so "not found" rows count too
+CACHE_STALE_GRACE = 30 * 24 * 3600  # Expired rows kept this long as a fallback while rate limited
+LAST_ACCESS_FLUSH_SECONDS = 60  # How often memory hits are written back as last_access on disk
+
+# Offline bundle settings
+BUNDLE_FILE = os.getenv('POKEAPI_BUNDLE_FILE', 'pokeapi_bundle.sqlite3')
+BUNDLE_VERSION = 1  # Bump when the bundle layout changes; older bundles are ignored
+BUNDLE_MAX_AGE = 30 * 24 * 3600  # Bundled entries older than this are refreshed from the network
+BUNDLE_CONCURRENCY = 8  # Parallel requests while building, to stay polite to pokeapi.co
+BUNDLE_CHECK_SECONDS = 5  # How often an open bundle checks whether build-bundle replaced its file
+
+# Name lists used for fuzzy matching, keyed by category
+NAME_LIST_ENDPOINTS = {
+    'pokemon': 'pokemon?limit=1000',
+    'move': 'move?limit=1000',
+    'ability': 'ability?limit=1000',
+    'type': 'type',
+    'item': 'item?limit=2500',
+}
+SPECIES_LIST_ENDPOINT = 'pokemon-species?limit=1100'
+
+MISSING = object()  # Returned by ResponseCache.get on a cache miss
+
+# One pooled keep-alive session shared by every command
+_session = None
+
+async def get_session():
+    """Returns the shared aiohttp session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=POKEAPI_MAX_CONNECTIONS, keepalive_timeout=60)
+        _session = aiohttp.ClientSession(connector=connector, timeout=POKEAPI_TIMEOUT)
+    return _session
+
+async def close_session():
+    """Closes the shared aiohttp session. Call this when the bot shuts down."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    cache.close()
+    bundle.close()
+
+def endpoint_from_url(url: str):
+    """Turns a full PokéAPI URL into the endpoint form used by get_pokeapi_data."""
+    return url.replace(POKEAPI_BASE_URL, '').strip('/')
+
+class NotFound(Exception):
+    """Raised by fetch_pokeapi_data when the PokéAPI answers 404."""
+
+def english_entry(entries, field):
+    """Returns the English text of an effect_entries-style list."""
+    return next((entry[field] for entry in entries if entry['language']['name'] == 'en'), "No description available.")
+
+# Compact records. Only the fields the commands use are kept, which makes a
+# cached pokemon/<name> a few hundred bytes instead of hundreds of KB of raw JSON.
+@dataclass(slots=True)
+class PokemonRecord:
+    name: str
+    types: list
+    abilities: list
+    stats: list  # [(stat name, base stat)]
+    base_experience: object
+    sprite: str
+    species_endpoint: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(
+            name=data['name'],
+            types=[t['type']['name'] for t in data['types']],
+            abilities=[a['ability']['name'] for a in data['abilities']],
+            stats=[(s['stat']['name'], s['base_stat']) for s in data['stats']],
+            base_experience=data.get('base_experience', 'N/A'),
+            sprite=data['sprites']['front_default'],
+            species_endpoint=endpoint_from_url(data['species']['url']),
+        )
+
+@dataclass(slots=True)
+class SpeciesRecord:
+    name: str
+    habitat: str
+    evolution_chain_endpoint: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(
+            name=data['name'],
+            habitat=data['habitat']['name'] if data.get('habitat') else None,
+            evolution_chain_endpoint=endpoint_from_url(data['evolution_chain']['url']) if data.get('evolution_chain') else None,
+        )
+
+@dataclass(slots=True)
+class MoveRecord:
+    name: str
+    type: str
+    power: object
+    pp: object
+    accuracy: object
+    effect: str
+    short_effect: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(
+            name=data['name'],
+            type=data['type']['name'],
+            power=data['power'],
+            pp=data['pp'],
+            accuracy=data['accuracy'],
+            effect=english_entry(data['effect_entries'], 'effect'),
+            short_effect=english_entry(data['effect_entries'], 'short_effect'),
+        )
+
+@dataclass(slots=True)
+class AbilityRecord:
+    name: str
+    effect: str
+    short_effect: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(
+            name=data['name'],
+            effect=english_entry(data['effect_entries'], 'effect'),
+            short_effect=english_entry(data['effect_entries'], 'short_effect'),
+        )
+
+@dataclass(slots=True)
+class ItemRecord:
+    name: str
+    category: str
+    cost: object
+    effect: str
+    short_effect: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(
+            name=data['name'],
+            category=data['category']['name'],
+            cost=data['cost'],
+            effect=english_entry(data['effect_entries'], 'effect'),
+            short_effect=english_entry(data['effect_entries'], 'short_effect'),
+        )
+
+@dataclass(slots=True)
+class TypeRecord:
+    name: str
+    double_damage_to: list
+    half_damage_to: list
+    no_damage_to: list
+
+    @classmethod
+    def from_api(cls, data):
+        relations = data['damage_relations']
+        return cls(
+            name=data['name'],
+            double_damage_to=[t['name'] for t in relations['double_damage_to']],
+            half_damage_to=[t['name'] for t in relations['half_damage_to']],
+            no_damage_to=[t['name'] for t in relations['no_damage_to']],
+        )
+
+# Endpoint prefix -> record class. Other endpoints (name lists, evolution chains) stay raw JSON.
+RECORD_TYPES = {
+    'pokemon': PokemonRecord,
+    'pokemon-species': SpeciesRecord,
+    'move': MoveRecord,
+    'ability': AbilityRecord,
+    'item': ItemRecord,
+    'type': TypeRecord,
+}
+
+def record_type(endpoint):
+    """Returns the record class for a single-resource endpoint like 'move/tackle', or None."""
+    parts = endpoint.split('?')[0].split('/')
+    return RECORD_TYPES.get(parts[0]) if len(parts) == 2 else None
+
+def project(endpoint, data):
+    """Turns raw PokéAPI JSON into its compact record, if the endpoint has one."""
+    record_class = record_type(endpoint)
+    return record_class.from_api(data) if record_class and data is not None else data
+
+def to_cacheable(endpoint, value):
+    """JSON-serializable form of a cached value."""
+    if record_type(endpoint) and value is not None:
+        return {'__record__': [getattr(value, f.name) for f in fields(value)]}
+    return value
+
+def from_cacheable(endpoint, value):
+    """Inverse of to_cacheable. Raw JSON cached by older versions is projected on the way in."""
+    record_class = record_type(endpoint)
+    if record_class is None or value is None:
+        return value
+    if '__record__' in value:
+        return record_class(*value['__record__'])
+    return record_class.from_api(value)
+
+async def fetch_pokeapi_data(endpoint: str):
+    """Fetches an endpoint from the PokéAPI, retrying timeouts and server errors with backoff.
+
+    Returns None if the request keeps failing, raises NotFound on a 404 and
+    RateLimited when pokeapi_limiter has no request to spare.
+    """
+    path, _, query = endpoint.partition('?')
+    url = f"{POKEAPI_BASE_URL}{path}/" + (f"?{query}" if query else "")
+    session = await get_session()
+    delay = POKEAPI_BACKOFF
+    for attempt in range(POKEAPI_RETRIES):
+        await pokeapi_limiter.acquire()  # Raises RateLimited rather than keep a user waiting
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    increment('upstream_calls', upstream='pokeapi', outcome='ok')
+                    return await response.json()
+                if response.status == 404:
+                    increment('upstream_calls', upstream='pokeapi', outcome='not_found')
+                    raise NotFound(endpoint)
+                increment('upstream_calls', upstream='pokeapi', outcome='error')
+                if response.status != 429 and response.status < 500:
+                    return None  # Other client errors will not get better by retrying
+                print(f"PokéAPI returned {response.status} for {endpoint} (attempt {attempt + 1})")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            increment('upstream_calls', upstream='pokeapi', outcome='error')
+            print(f"PokéAPI request for {endpoint} failed (attempt {attempt + 1}): {e!r}")
+        if attempt + 1 < POKEAPI_RETRIES:
+            await asyncio.sleep(delay)
+            delay *= 2
+    return None
+
+def ttl_for(endpoint: str):
+    """Returns how long a successful response for this endpoint stays fresh."""
+    if '?' in endpoint or endpoint == 'type':
+        return LIST_CACHE_TTL
+    return CACHE_TTL
+
+class ResponseCache:
+    """PokéAPI responses kept in an SQLite file with a small in-memory LRU in front.
+
+    Entries expire after their TTL, "not found" results are stored with a short
+    TTL, and the least recently used entries are evicted once the rows on disk
+    (compressed bodies plus CACHE_ROW_OVERHEAD each) exceed max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=CACHE_MAX_BYTES, memory_size=MEMORY_CACHE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_size = memory_size
+        self._memory = OrderedDict()  # endpoint -> (expires_at, data)
+        self._touched = {}  # endpoint -> last memory hit not yet written to disk
+        self._flushed_at = time.time()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " endpoint TEXT PRIMARY KEY,"
+                " body BLOB,"  # NULL marks a negative (not found) result
+                " size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        return self._db
+
+    def _remember(self, endpoint, expires_at, data):
+        self._memory[endpoint] = (expires_at, data)
+        self._memory.move_to_end(endpoint)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def forget_memory(self):
+        """Empties the in-memory tier; the rows on disk stay."""
+        if self._db is not None:
+            self._flush_touched()
+        self._memory.clear()
+
+    def remember(self, endpoint, data, ttl):
+        """Keeps data in the in-memory tier only, e.g. entries served from the bundle."""
+        self._remember(endpoint, time.time() + ttl, data)
+
+    def get(self, endpoint):
+        """Returns the cached data (None for a cached miss), or MISSING if nothing fresh is stored."""
+        now = time.time()
+        entry = self._memory.get(endpoint)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(endpoint)
+                # Batched, but the disk LRU must still see the hottest entries as recently used
+                self._touched[endpoint] = now
+                if now - self._flushed_at > LAST_ACCESS_FLUSH_SECONDS:
+                    self._flush_touched()
+                return entry[1]
+            del self._memory[endpoint]
+
+        db = self._connect()
+        row = db.execute("SELECT body, expires_at FROM responses WHERE endpoint = ?", (endpoint,)).fetchone()
+        if row is None or row[1] <= now:
+            return MISSING
+        db.execute("UPDATE responses SET last_access = ? WHERE endpoint = ?", (now, endpoint))
+        data = from_cacheable(endpoint, json.loads(zlib.decompress(row[0]))) if row[0] is not None else None
+        self._remember(endpoint, row[1], data)
+        return data
+
+    def _flush_touched(self):
+        """Writes the last_access of memory hits back to their rows."""
+        if self._touched:
+            self._connect().executemany("UPDATE responses SET last_access = ? WHERE endpoint = ?",
+                                        [(t, endpoint) for endpoint, t in self._touched.items()])
+            self._touched.clear()
+        self._flushed_at = time.time()
+
+    def get_stale(self, endpoint):
+        """Returns whatever is stored for endpoint even if it expired, or MISSING."""
+        entry = self._memory.get(endpoint)
+        if entry is not None:
+            return entry[1]
+        row = self._connect().execute("SELECT body FROM responses WHERE endpoint = ?", (endpoint,)).fetchone()
+        if row is None or row[0] is None:
+            return MISSING
+        return from_cacheable(endpoint, json.loads(zlib.decompress(row[0])))
+
+    def set(self, endpoint, data, ttl):
+        """Stores a response (or None for "not found") for ttl seconds."""
+        now = time.time()
+        body = zlib.compress(json.dumps(to_cacheable(endpoint, data), separators=(',', ':')).encode()) if data is not None else None
+        size = len(body) if body is not None else 0
+        db = self._connect()
+        db.execute(
+            "INSERT OR REPLACE INTO responses (endpoint, body, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (endpoint, body, size, now + ttl, now),
+        )
+        self._remember(endpoint, now + ttl, data)
+        self._evict()
+
+    def _total_bytes(self):
+        return self._connect().execute("SELECT COALESCE(SUM(size), 0) + COUNT(*) * ? FROM responses", (CACHE_ROW_OVERHEAD,)).fetchone()[0]
+
+    def _evict(self):
+        """Fits the rows in max_bytes: drops expired rows first, then the least recently used ones.
+
+        Expired "not found" rows go straight away. Expired responses are kept for
+        CACHE_STALE_GRACE, since get_stale serves them while the PokéAPI is rate limited.
+        """
+        if self._total_bytes() <= self.max_bytes:
+            return
+        db = self._connect()
+        now = time.time()
+        db.execute("DELETE FROM responses WHERE expires_at <= ? AND (body IS NULL OR expires_at <= ?)", (now, now - CACHE_STALE_GRACE))
+        total = self._total_bytes()
+        target = self.max_bytes * 0.9  # Leave some headroom so we don't evict on every insert
+        self._flush_touched()
+        doomed = []
+        for endpoint, size in db.execute("SELECT endpoint, size FROM responses ORDER BY last_access"):
+            if total <= target:
+                break
+            doomed.append((endpoint,))
+            total -= size + CACHE_ROW_OVERHEAD
+        db.executemany("DELETE FROM responses WHERE endpoint = ?", doomed)
+        for (endpoint,) in doomed:
+            self._memory.pop(endpoint, None)
+
+    def close(self):
+        if self._db is not None:
+            self._flush_touched()
+            self._db.close()
+            self._db = None
+
+class Bundle:
+    """Read-only snapshot of PokéAPI responses built ahead of time by build_bundle.
+
+    Opening it only reads the metadata row, so startup stays fast no matter how
+    many entries were bundled; bodies are decompressed one by one on demand.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.built_at = None
+        self._db = None
+        self._file = None  # (inode, mtime) of the open bundle file
+        self._rejected = None  # (inode, mtime) of a bundle file that failed to open
+        self._checked_at = float('-inf')
+
+    def open(self):
+        """Opens the bundle file. Returns False if it is missing or from another version.
+
+        The file is looked at no more than every BUNDLE_CHECK_SECONDS, so a
+        bundle built or replaced by build-bundle is picked up within that time.
+        A rejected file is not opened again until it is replaced.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < BUNDLE_CHECK_SECONDS:
+            return self._db is not None
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self.close()
+            return False
+        file = (stat.st_ino, stat.st_mtime_ns)
+        if self._db is not None:
+            if file == self._file:
+                return True
+            print(f"Reopening rebuilt PokéAPI bundle {self.path}")
+            self.close()
+        if file == self._rejected:
+            return False
+        db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            meta = dict(db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as e:
+            print(f"Ignoring unreadable PokéAPI bundle {self.path}: {e}")
+            db.close()
+            self._rejected = file
+            return False
+        if int(meta.get('version', 0)) != BUNDLE_VERSION:
+            print(f"Ignoring PokéAPI bundle {self.path}: version {meta.get('version')}, expected {BUNDLE_VERSION}")
+            db.close()
+            self._rejected = file
+            return False
+        self.built_at = float(meta['built_at'])
+        self._db = db
+        self._file = file
+        return True
+
+    @property
+    def fresh(self):
+        return self.built_at is not None and time.time() - self.built_at < BUNDLE_MAX_AGE
+
+    def get(self, endpoint):
+        """Returns the bundled data for an endpoint, or MISSING if it was not bundled."""
+        if not self.open():
+            return MISSING
+        row = self._db.execute("SELECT body FROM entries WHERE endpoint = ?", (endpoint,)).fetchone()
+        if row is None:
+            return MISSING
+        return from_cacheable(endpoint, json.loads(zlib.decompress(row[0])))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self.built_at = None
+        self._file = None
+
+cache = ResponseCache(CACHE_FILE)
+bundle = Bundle(BUNDLE_FILE)
+pokeapi_flight = SingleFlight('pokeapi')
+pokeapi_limiter = TokenBucket('pokeapi', rate=POKEAPI_REQUESTS_PER_SECOND, capacity=2 * POKEAPI_REQUESTS_PER_SECOND,
+                              reserve=POKEAPI_REQUESTS_PER_SECOND / 4)
+
+_served_bundle = None  # built_at of the bundle the memory tier has been filled from
+
+def check_bundle():
+    """Picks up a bundle rebuilt while the bot runs, forgetting entries kept in memory from the old one."""
+    global _served_bundle
+    bundle.open()
+    if bundle.built_at != _served_bundle:
+        if _served_bundle is not None:
+            cache.forget_memory()
+        _served_bundle = bundle.built_at
+
+def data_version():
+    """Identifies the PokéAPI data being served, for caches of things rendered from it."""
+    check_bundle()  # Render cache hits never reach the bundle otherwise
+    return bundle.built_at
+
+async def get_pokeapi_data(endpoint: str):
+    """Cached function to get data from the PokéAPI."""
+    endpoint = endpoint.strip('/')
+    check_bundle()
+    with timed('fetch'):
+        data = cache.get(endpoint)
+        if data is not MISSING:
+            increment('cache_requests', cache='pokeapi', result='hit')
+            return data
+        increment('cache_requests', cache='pokeapi', result='miss')
+        # Concurrent cache misses for the same endpoint share one load
+        return await pokeapi_flight.run(endpoint, load_pokeapi_data, endpoint)
+
+async def load_pokeapi_data(endpoint):
+    """Loads an endpoint missing from the cache, from the bundle or the network.
+
+    Raises RateLimited if the PokéAPI is rate limited and there is no stale copy to serve.
+    """
+    bundled = bundle.get(endpoint)
+    if bundled is not MISSING and bundle.fresh:
+        cache.remember(endpoint, bundled, ttl_for(endpoint))
+        return bundled
+
+    try:
+        data = project(endpoint, await fetch_pokeapi_data(endpoint))
+    except NotFound:
+        cache.set(endpoint, None, NEGATIVE_CACHE_TTL)
+        return None
+    except RateLimited as e:
+        # An expired copy beats an error; PokéAPI data hardly ever changes
+        stale = cache.get_stale(endpoint)
+        if stale is MISSING:
+            stale = bundled
+        if stale is MISSING:
+            raise  # Nothing to fall back on, the command tells the user to try again
+        print(f"{e}: serving {endpoint} from a stale copy")
+        return stale
+    if data is not None:
+        cache.set(endpoint, data, ttl_for(endpoint))
+    elif bundled is not MISSING:
+        return bundled  # The network is down, a stale bundled copy beats nothing
+    return data
+
+async def build_bundle(path, with_pokemon=False):
+    """Downloads the name lists and every type, move, ability, item, species and
+    evolution chain into a single bundle file at path, stored as compact records."""
+    run_as_background()  # Wait for rate limit tokens instead of giving up
+    started = time.perf_counter()
+    entries = {}
+    semaphore = asyncio.Semaphore(BUNDLE_CONCURRENCY)
+
+    async def fetch_all(endpoints):
+        async def fetch(endpoint):
+            async with semaphore:
+                try:
+                    data = await fetch_pokeapi_data(endpoint)
+                except NotFound:
+                    data = None
+            if data is None:
+                print(f"Skipping {endpoint}: not available")
+            else:
+                entries[endpoint] = data
+            return data
+        endpoints = [e for e in endpoints if e not in entries]
+        print(f"Fetching {len(endpoints)} endpoints...")
+        return await asyncio.gather(*(fetch(e) for e in endpoints))
+
+    await fetch_all(list(NAME_LIST_ENDPOINTS.values()) + [SPECIES_LIST_ENDPOINT])
+    missing = [e for e in NAME_LIST_ENDPOINTS.values() if e not in entries]
+    if missing:
+        raise RuntimeError(f"Could not download name lists: {', '.join(missing)}")
+
+    def names(category):
+        return [r['name'] for r in entries[NAME_LIST_ENDPOINTS[category]]['results']]
+
+    details = [f'type/{n}' for n in names('type')]
+    details += [f'move/{n}' for n in names('move')]
+    details += [f'ability/{n}' for n in names('ability')]
+    details += [f'item/{n}' for n in names('item')]
+    if with_pokemon:
+        details += [f'pokemon/{n}' for n in names('pokemon')]
+    if SPECIES_LIST_ENDPOINT in entries:
+        # Species are linked by id from pokemon data, so key them by their URL
+        details += [endpoint_from_url(r['url']) for r in entries[SPECIES_LIST_ENDPOINT]['results']]
+    fetched = await fetch_all(details)
+
+    chains = {endpoint_from_url(d['evolution_chain']['url']) for d in fetched if d and d.get('evolution_chain')}
+    await fetch_all(sorted(chains))
+
+    # Write to a temporary file first so a running bot never sees a half-built bundle
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    with db:
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        db.execute("CREATE TABLE entries (endpoint TEXT PRIMARY KEY, body BLOB NOT NULL)")
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [('version', str(BUNDLE_VERSION)), ('built_at', str(time.time()))])
+        db.executemany(
+            "INSERT INTO entries VALUES (?, ?)",
+            ((endpoint, zlib.compress(json.dumps(to_cacheable(endpoint, project(endpoint, data)), separators=(',', ':')).encode(), 9))
+             for endpoint, data in entries.items()),
+        )
+    db.execute("VACUUM")
+    db.close()
+    os.replace(tmp_path, path)
+    print(f"Wrote {len(entries)} entries to {path} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - started:.0f}s")
+
+def deep_sizeof(obj, seen=None):
+    """Approximate memory held by obj and everything it references, in bytes."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__)
+    return size
+
+# A typical entry of each projected kind, used by memory-report
+MEMORY_REPORT_ENDPOINTS = ['pokemon/pikachu', 'pokemon-species/25', 'move/thunderbolt', 'ability/static', 'item/leftovers', 'type/electric']
+
+async def memory_report(endpoints=MEMORY_REPORT_ENDPOINTS):
+    """Prints how much memory each endpoint takes as raw JSON versus as its compact record."""
+    print(f"{'endpoint':<24}{'raw JSON':>12}{'record':>12}{'saved':>8}")
+    total_raw = total_record = 0
+    for endpoint in endpoints:
+        try:
+            data = await fetch_pokeapi_data(endpoint)
+        except NotFound:
+            data = None
+        if data is None:
+            print(f"{endpoint:<24}{'unavailable':>12}")
+            continue
+        raw, record = deep_sizeof(data), deep_sizeof(project(endpoint, data))
+        total_raw += raw
+        total_record += record
+        print(f"{endpoint:<24}{raw:>12,}{record:>12,}{1 - record / raw:>8.1%}")
+    if total_raw:
+        print(f"{'total':<24}{total_raw:>12,}{total_record:>12,}{1 - total_record / total_raw:>8.1%}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="PokéAPI helpers for ODLBot.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build = subcommands.add_parser('build-bundle', help="Download an offline PokéAPI bundle for fast startup.")
+    build.add_argument('--output', default=BUNDLE_FILE, help=f"Bundle path (default: {BUNDLE_FILE})")
+    build.add_argument('--with-pokemon', action='store_true', help="Also bundle the large pokemon/<name> entries.")
+    report = subcommands.add_parser('memory-report', help="Compare the memory used by raw JSON and compact records.")
+    report.add_argument('endpoints', nargs='*', default=MEMORY_REPORT_ENDPOINTS, help="Endpoints to measure.")
+    args = parser.parse_args()
+    if args.command == 'memory-report':
+        async def run_report():
+            try:
+                await memory_report(args.endpoints)
+            finally:
+                await close_session()
+        asyncio.run(run_report())
+    elif args.command == 'build-bundle':
+        async def run_build():
+            try:
+                await build_bundle(args.output, with_pokemon=args.with_pokemon)
+            finally:
+                await close_session()
+        asyncio.run(run_build())
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from odl_metrics import increment, timed
+
+# Variables
+RENDER_CACHE_SIZE = 1024  # Rendered responses kept, across all commands
+
+class RenderCache:
+    """Final command responses, ready to pass to ctx.send.
+
+    Entries are keyed by command and normalized argument and remember the
+    version of the data they were rendered from (the PokéAPI bundle or the
+    sheet snapshot). An entry rendered from an older version is a miss, so
+    a repeated query costs one dictionary lookup until the data changes.
+    """
+
+    def __init__(self, size=RENDER_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()  # (command, key) -> (version, send kwargs)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, command, key, version):
+        """Returns the send kwargs rendered from this data version, or None."""
+        entry = self._entries.get((command, key))
+        if entry is None or entry[0] != version:
+            increment('cache_requests', cache='render', result='miss')
+            return None
+        increment('cache_requests', cache='render', result='hit')
+        self._entries.move_to_end((command, key))
+        return entry[1]
+
+    def set(self, command, key, version, response):
+        self._entries[(command, key)] = (version, response)
+        self._entries.move_to_end((command, key))
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    async def render(self, command, key, version, render):
+        """Returns the cached response for (command, key), rendering it first on a miss.
+
+        render is a coroutine function returning send kwargs, or None when
+        there is nothing to show. None is not cached.
+        """
+        response = self.get(command, key, version)
+        if response is None:
+            with timed('render'):
+                response = await render()
+            if response is not None:
+                self.set(command, key, version, response)
+        return response
+
+    async def send(self, ctx, command, key, version, render):
+        """Sends the response from render(); returns False, without sending, if there is nothing to show."""
+        response = await self.render(command, key, version, render)
+        if response is None:
+            return False
+        await ctx.send(**response)
+        return True
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import hashlib
+import asyncio
+from gspread.utils import fill_gaps
+from odl_upstream import SingleFlight, TokenBucket, RateLimited
+from odl_metrics import increment, timed
+
+# Variables
+SPREADSHEET_NAME = "Oshawott Draft League"
+SHEETS_REFRESH_MINUTES = float(os.getenv('SHEETS_REFRESH_MINUTES', 5))
+SHEETS_READS_PER_MINUTE = float(os.getenv('SHEETS_READS_PER_MINUTE', 60))  # Google's default per-user read quota
+
+# Everything the commands read, fetched together in one batch_get
+SNAPSHOT_RANGES = {
+    'standings': "'Standings'",
+    'mvp': "'MVP Race'",
+    'draft': "'Draft But Simple'",
+    'rules': "'Rules'!C11:D16",
+    'data': "'Data'",
+}
+
+sheets_limiter = TokenBucket('sheets', rate=SHEETS_READS_PER_MINUTE / 60, capacity=10, reserve=3)
+
+class SheetSnapshot:
+    """In-memory copy of the league spreadsheet ranges the bot reads.
+
+    The spreadsheet is opened once and every range is fetched in a single
+    values_batch_get call, so commands are served from memory and the Sheets
+    API only sees one read per refresh instead of one or two per message.
+
+    authorize is a blocking callable returning a gspread client. It is only
+    called, in a worker thread, on the first refresh.
+
+    Reads go through limiter. Once loaded, a refresh that is rate limited or
+    fails keeps the previous values and sets stale_since instead.
+    """
+
+    def __init__(self, authorize, name=SPREADSHEET_NAME, ranges=SNAPSHOT_RANGES, limiter=sheets_limiter):
+        self.authorize = authorize
+        self.client = None
+        self.name = name
+        self.ranges = dict(ranges)
+        self.values = {}
+        self.fetched_at = None
+        self.version = 0  # Bumped whenever any range changes
+        self.hashes = {}  # Range key -> digest of its values, to detect changes
+        self.changed = set()  # Range keys whose values changed in the last refresh
+        self.stale_since = None  # When refreshing first failed, while the values are out of date
+        self.limiter = limiter
+        self._spreadsheet = None
+        self._flight = SingleFlight('sheets')
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Registers listener(snapshot) to be called after every successful refresh.
+
+        snapshot.changed tells the listener which ranges actually changed.
+        """
+        self._listeners.append(listener)
+
+    @property
+    def loaded(self):
+        return self.fetched_at is not None
+
+    def _fetch(self):
+        """Blocking part of a refresh, run in a worker thread."""
+        if self.client is None:
+            self.client = self.authorize()
+        if self._spreadsheet is None:
+            self._spreadsheet = self.client.open(self.name)
+        response = self._spreadsheet.values_batch_get(list(self.ranges.values()))
+        values = {}
+        for key, value_range in zip(self.ranges, response.get('valueRanges', [])):
+            rows = value_range.get('values', [])
+            # Pad ragged rows the same way get_all_values() does
+            values[key] = fill_gaps(rows) if rows else []
+        return values
+
+    async def refresh(self):
+        """Fetches every range again. Concurrent callers share the same refresh."""
+        await self._flight.run(tuple(self.ranges.values()), self._refresh)
+
+    async def _refresh(self):
+        started = time.perf_counter()
+        try:
+            # Opening the spreadsheet is a read of its own
+            await self.limiter.acquire(1 if self._spreadsheet is not None else 2)
+            try:
+                values = await asyncio.to_thread(self._fetch)
+            except Exception:
+                increment('upstream_calls', upstream='sheets', outcome='error')
+                raise
+            increment('upstream_calls', upstream='sheets', outcome='ok')
+        except Exception as e:
+            if not self.loaded:
+                raise
+            if self.stale_since is None:
+                self.stale_since = time.time()
+            if isinstance(e, RateLimited):
+                print(f"Keeping sheet snapshot v{self.version}: {e}")
+                return
+            raise
+        self.stale_since = None
+        hashes = {key: hashlib.sha1(json.dumps(rows).encode()).hexdigest() for key, rows in values.items()}
+        self.changed = {key for key in hashes if hashes[key] != self.hashes.get(key)}
+        self.values = values
+        self.hashes = hashes
+        self.fetched_at = time.time()
+        if self.changed:
+            self.version += 1
+        print(f"Refreshed sheet snapshot v{self.version} in {(time.perf_counter() - started) * 1000:.0f} ms"
+              f" (changed: {', '.join(sorted(self.changed)) or 'nothing'})")
+        for listener in self._listeners:
+            listener(self)
+
+    async def get(self, key):
+        """Returns the rows for one of the snapshot ranges, loading the snapshot if needed."""
+        increment('cache_requests', cache='sheets', result='hit' if self.loaded else 'miss')
+        if not self.loaded:
+            with timed('fetch'):
+                await self.refresh()
+        return self.values.get(key, [])
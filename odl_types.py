@@ -0,0 +1,72 @@
+import numpy as np
+
+# Variables
+NON_BATTLE_TYPES = {'unknown', 'shadow', 'stellar'}  # Listed by the PokéAPI but never on a Pokémon
+
+# Damage relation -> multiplier, seen from the attacking type
+ATTACK_RELATIONS = {
+    'double_damage_to': 2.0,
+    'half_damage_to': 0.5,
+    'no_damage_to': 0.0,
+}
+
+class TypeChart:
+    """Type effectiveness as an attacker x defender NumPy matrix.
+
+    The matrix has one extra "no type" column of 1s so a mono-type Pokémon can
+    be treated as a dual-type one, which lets a whole team be looked up in a
+    single fancy-indexing operation.
+    """
+
+    def __init__(self, names, matrix):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.none = len(self.names)  # Column index used for a missing second type
+        self.matrix = np.ones((len(self.names), len(self.names) + 1))
+        self.matrix[:, :len(self.names)] = matrix
+
+    @classmethod
+    def from_type_data(cls, type_data):
+        """Builds the chart from a mapping of type name -> TypeRecord."""
+        names = [name for name in type_data if name not in NON_BATTLE_TYPES]
+        index = {name: i for i, name in enumerate(names)}
+        matrix = np.ones((len(names), len(names)))
+        for attacker in names:
+            record = type_data[attacker]
+            for relation, multiplier in ATTACK_RELATIONS.items():
+                for defender in getattr(record, relation):
+                    if defender in index:
+                        matrix[index[attacker], index[defender]] = multiplier
+        return cls(names, matrix)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def _columns(self, types):
+        """Returns the (first, second) defender columns for a list of one or two type names."""
+        columns = [self.index[t] for t in types if t in self.index][:2]
+        while len(columns) < 2:
+            columns.append(self.none)
+        return columns
+
+    def attacking(self, attacker):
+        """Multipliers of attacker's moves against every single type."""
+        return self.matrix[self.index[attacker], :self.none]
+
+    def defending(self, types):
+        """Exact multipliers (0, 0.25, 0.5, 1, 2 or 4) of every attacking type against one or two types."""
+        first, second = self._columns(types)
+        return self.matrix[:, first] * self.matrix[:, second]
+
+    def team_profile(self, team):
+        """Defensive multipliers for a whole team at once.
+
+        team is a list of type lists, one per Pokémon. Returns a members x
+        attacking types array.
+        """
+        columns = np.array([self._columns(types) for types in team], dtype=int).reshape(-1, 2)
+        return (self.matrix[:, columns[:, 0]] * self.matrix[:, columns[:, 1]]).T
+
+    def names_where(self, multipliers, condition):
+        """Returns the type names whose multiplier satisfies condition, in chart order."""
+        return [self.names[i] for i in np.flatnonzero(condition(multipliers))]
@@ -0,0 +1,133 @@
+import time
+import asyncio
+import contextvars
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one upstream request.
+
+    The first caller for a key starts the call; everyone else asking for the
+    same key while it is in flight awaits that same result instead of firing a
+    duplicate request. calls and coalesced count how often that happened.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        flights[name] = self
+
+    async def run(self, key, func, *args):
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # Shielded so one caller giving up doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark it retrieved even if every caller went away
+
+flights = {}  # Name -> SingleFlight, for reporting
+
+def coalescing_stats():
+    """Returns {name: (calls, coalesced)} for every SingleFlight."""
+    return {name: (flight.calls, flight.coalesced) for name, flight in flights.items()}
+
+# Rate limiting. Every upstream gets a TokenBucket; calls made on behalf of a
+# user in a command go ahead of background refreshes.
+USER, BACKGROUND = 0, 1
+USER_MAX_WAIT = 5  # Seconds a user-facing call waits for a token before falling back to cached data
+
+priority = contextvars.ContextVar('upstream_priority', default=USER)
+
+def run_as_background():
+    """Marks the upstream calls of the current task (and tasks it starts) as background work."""
+    priority.set(BACKGROUND)
+
+class RateLimited(Exception):
+    """Raised by TokenBucket.acquire when no token is available within the allowed wait."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} is rate limited, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket limiting the calls made to one upstream.
+
+    Tokens refill at rate per second up to capacity. Background callers leave
+    reserve tokens in the bucket and step aside while a user-facing caller is
+    waiting, so commands keep working while a refresh loop is busy.
+    """
+
+    def __init__(self, name, rate, capacity, reserve=0):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.granted = 0
+        self.limited = 0
+        self._users_waiting = 0
+        buckets[name] = self
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens=1, max_wait=None):
+        """Takes tokens, waiting for them if needed.
+
+        User-facing calls wait at most USER_MAX_WAIT seconds and background
+        calls as long as it takes, unless max_wait says otherwise. Raises
+        RateLimited if the tokens won't be available in time.
+        """
+        user = priority.get() == USER
+        if max_wait is None:
+            max_wait = USER_MAX_WAIT if user else float('inf')
+        deadline = time.monotonic() + max_wait
+        while True:
+            self._refill()
+            floor = 0 if user else self.reserve
+            if self.tokens - tokens >= floor and (user or not self._users_waiting):
+                self.tokens -= tokens
+                self.granted += tokens
+                return
+            wait = max((tokens + floor - self.tokens) / self.rate, 0.01)
+            if time.monotonic() + wait > deadline:
+                self.limited += 1
+                raise RateLimited(self.name, wait)
+            if user:
+                self._users_waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                if user:
+                    self._users_waiting -= 1
+
+buckets = {}  # Name -> TokenBucket, for reporting
+
+def shared_bucket(name, rate, capacity, reserve=0):
+    """Returns the TokenBucket registered as name, creating it the first time.
+
+    For modules loaded as extensions: this module isn't reloaded with them, so
+    a reload keeps the bucket, and the tokens already spent, instead of
+    starting again at full capacity. The limits are updated in place.
+    """
+    bucket = buckets.get(name)
+    if bucket is None:
+        return TokenBucket(name, rate, capacity, reserve)
+    bucket._refill()
+    bucket.rate, bucket.capacity, bucket.reserve = rate, capacity, reserve
+    bucket.tokens = min(bucket.tokens, capacity)
+    return bucket
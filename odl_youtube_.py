@@ -1,44 +1,148 @@
 import os
-import discord
-from discord.ext import tasks, commands
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from discord.ext import tasks
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
+from odl_upstream import shared_bucket, RateLimited, run_as_background
+from odl_metrics import increment
 
 # Load environment variables
 load_dotenv()
 
 # Variables
-DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 VIDEOS_CHANNEL_ID = 1210301630814224465  # Replace with your Discord videos channel ID
 CLIPS_AND_HIGHLIGHTS_CHANNEL_ID = 1210293328655028317  # Replace with your Discord clips and highlights channel ID
-POSTED_VIDEOS_FILE = 'posted_videos.txt'
+POSTED_VIDEOS_FILE = 'posted_videos.txt'  # Legacy list, imported into POSTED_VIDEOS_DB once
+POSTED_VIDEOS_DB = 'posted_videos.sqlite3'
+POSTED_VIDEOS_RETENTION_DAYS = 365  # Older IDs are pruned during the daily compaction
+UPLOADS_PAGE_SIZE = 50  # playlistItems.list costs 1 unit per page whatever its size, so use the maximum
+MAX_CATCHUP_PAGES = 4  # Never announce more than 200 videos of backlog per channel per check
+DISCORD_MESSAGE_LIMIT = 2000
 CHANNEL_URLS_FILE = 'channel_urls.txt'
+CHANNEL_IDS_FILE = 'channel_ids.json'  # Cache of handle -> channel and uploads playlist IDs
+
+# Polling schedule: every channel gets its own interval between these bounds
+POLL_TICK_MINUTES = 1  # How often the scheduler looks for channels that are due
+MIN_POLL_MINUTES = 10  # After a new upload, or around the hours a channel usually uploads
+MAX_POLL_MINUTES = 6 * 60  # Dormant or failing channels back off up to this
+UPLOAD_HOURS_KEPT = 5  # Only the latest uploads say when a channel usually uploads
+YOUTUBE_WORKERS = 4  # Threads running the blocking googleapiclient calls
+YOUTUBE_QUOTA_PER_DAY = int(os.getenv('YOUTUBE_QUOTA_PER_DAY', 10000))  # Data API units; both calls we make cost 1
 
 # Special channel handle
 SPECIAL_CHANNEL_HANDLE = 'OshawottDraftLeague'
 
-# YouTube API setup
-youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+# YouTube API setup. googleapiclient's HTTP transport isn't thread-safe, so every
+# worker thread builds its own client. The worker pool is created by open_poller().
+youtube_executor = None
+_youtube_clients = threading.local()
 
-# Set up Discord intents
-intents = discord.Intents.default()
-intents.messages = True
-intents.message_content = True
-intents.guilds = True
+def get_youtube():
+    if not hasattr(_youtube_clients, 'youtube'):
+        _youtube_clients.youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    return _youtube_clients.youtube
 
-# Discord Bot setup
-bot = commands.Bot(command_prefix='!', intents=intents)
+# The daily quota is spread evenly over the day, with a bit of burst for catching up.
+# Shared so reloading the extension doesn't hand out the day's quota again.
+youtube_limiter = shared_bucket('youtube', rate=YOUTUBE_QUOTA_PER_DAY / 86400, capacity=YOUTUBE_QUOTA_PER_DAY / 20)
 
-def read_posted_videos():
-    if os.path.exists(POSTED_VIDEOS_FILE):
-        with open(POSTED_VIDEOS_FILE, 'r') as file:
-            return file.read().splitlines()
-    return []
+async def run_youtube(func, *args):
+    """Runs a blocking YouTube helper making one API call on the worker pool.
+
+    Raises RateLimited straight away if the quota has nothing to spare, so the
+    poller skips the channel until a later tick instead of queueing behind it.
+    """
+    await youtube_limiter.acquire(max_wait=0)
+    increment('youtube_quota_units')
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(youtube_executor, func, *args)
+    except Exception:
+        increment('upstream_calls', upstream='youtube', outcome='error')
+        raise
+    increment('upstream_calls', upstream='youtube', outcome='ok')
+    return result
+
+# Loaded as an extension of the league bot, see setup() at the bottom
+bot = None
+
+class PostedVideoStore:
+    """IDs of videos already announced, loaded once into a set and backed by SQLite.
+
+    Every add is its own committed transaction, so an ID is either fully
+    recorded or not at all, even if the bot crashes mid-write.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS posted (video_id TEXT PRIMARY KEY, posted_at REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS posted_posted_at ON posted (posted_at)")
+        # Newest upload already handled per YouTube channel, so a check only looks at newer ones
+        self.db.execute("CREATE TABLE IF NOT EXISTS cursors (channel_id TEXT PRIMARY KEY, published_at TEXT NOT NULL, video_id TEXT NOT NULL)")
+        self.video_ids = {row[0] for row in self.db.execute("SELECT video_id FROM posted")}
+
+    def __contains__(self, video_id):
+        return video_id in self.video_ids
+
+    def __len__(self):
+        return len(self.video_ids)
+
+    def add(self, video_id):
+        self.db.execute("INSERT OR IGNORE INTO posted (video_id, posted_at) VALUES (?, ?)", (video_id, time.time()))
+        self.video_ids.add(video_id)
+
+    def get_cursor(self, channel_id):
+        """Returns (published_at, video_id) of the newest handled upload, or None."""
+        return self.db.execute("SELECT published_at, video_id FROM cursors WHERE channel_id = ?", (channel_id,)).fetchone()
+
+    def set_cursor(self, channel_id, published_at, video_id):
+        self.db.execute("INSERT OR REPLACE INTO cursors (channel_id, published_at, video_id) VALUES (?, ?, ?)", (channel_id, published_at, video_id))
 
-def write_posted_video(video_id):
-    with open(POSTED_VIDEOS_FILE, 'a') as file:
-        file.write(video_id + '\n')
+    def import_legacy_file(self, path):
+        """Imports the IDs from the old posted_videos.txt, once."""
+        if not os.path.exists(path) or self.video_ids:
+            return
+        with open(path, 'r') as file:
+            video_ids = [line.strip() for line in file if line.strip()]
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT OR IGNORE INTO posted (video_id, posted_at) VALUES (?, ?)", [(v, time.time()) for v in video_ids])
+        self.video_ids.update(video_ids)
+        print(f"Imported {len(video_ids)} posted video IDs from {path}")
+
+    def compact(self, retention_days=POSTED_VIDEOS_RETENTION_DAYS):
+        """Drops IDs older than the retention period and reclaims the space."""
+        cutoff = time.time() - retention_days * 24 * 3600
+        expired = [row[0] for row in self.db.execute("SELECT video_id FROM posted WHERE posted_at < ?", (cutoff,))]
+        if expired:
+            self.db.execute("DELETE FROM posted WHERE posted_at < ?", (cutoff,))
+            self.db.execute("VACUUM")
+            self.video_ids.difference_update(expired)
+        return len(expired)
+
+    def close(self):
+        self.db.close()
+
+posted_videos = None  # PostedVideoStore, opened by open_poller()
+
+def open_poller():
+    """Creates the worker pool and opens the posted video store."""
+    global youtube_executor, posted_videos
+    youtube_executor = ThreadPoolExecutor(max_workers=YOUTUBE_WORKERS, thread_name_prefix='youtube')
+    posted_videos = PostedVideoStore(POSTED_VIDEOS_DB)
+    posted_videos.import_legacy_file(POSTED_VIDEOS_FILE)
+
+def close_poller():
+    youtube_executor.shutdown(wait=False, cancel_futures=True)
+    posted_videos.close()
 
 def read_channel_urls():
     if os.path.exists(CHANNEL_URLS_FILE):
@@ -46,86 +150,242 @@ def read_channel_urls():
             return file.read().splitlines()
     return []
 
-def get_channel_id_by_custom_handle(handle):
+def read_channel_ids():
+    if os.path.exists(CHANNEL_IDS_FILE):
+        with open(CHANNEL_IDS_FILE, 'r') as file:
+            return json.load(file)
+    return {}
+
+def write_channel_ids(channel_ids):
+    # Write to a temporary file first so a crash never leaves a truncated cache behind
+    tmp_file = CHANNEL_IDS_FILE + '.tmp'
+    with open(tmp_file, 'w') as file:
+        json.dump(channel_ids, file, indent=2)
+    os.replace(tmp_file, CHANNEL_IDS_FILE)
+
+channel_ids = read_channel_ids()
+channel_ids_lock = threading.Lock()
+
+def get_channel_by_handle(handle):
+    """Returns {'channel_id', 'uploads_playlist_id'} for a handle, or None if it doesn't exist.
+
+    Resolved with channels.list(forHandle=...) (1 quota unit) and cached in
+    CHANNEL_IDS_FILE, which check_channel reads first, instead of a 100 unit
+    search.list on every check.
+    """
     # Remove the '@' from the handle
     handle = handle.lstrip('@')
-    
-    request = youtube.search().list(
-        part='snippet',
-        q=handle,
-        type='channel',
+    request = get_youtube().channels().list(
+        part='id,contentDetails',
+        forHandle=handle,
         maxResults=1
     )
     response = request.execute()
 
-    if 'items' in response and len(response['items']) > 0:
-        return response['items'][0]['snippet']['channelId']
+    if not response.get('items'):
+        return None  # Return None if the channel is not found
 
-    return None  # Return None if the channel is not found
+    item = response['items'][0]
+    channel = {
+        'channel_id': item['id'],
+        'uploads_playlist_id': item['contentDetails']['relatedPlaylists']['uploads'],
+    }
+    with channel_ids_lock:
+        channel_ids[handle] = channel
+        write_channel_ids(channel_ids)
+    return channel
 
-@bot.event
-async def on_ready():
-    print(f'{bot.user.name} has connected to Discord!')
-    check_new_video.start()  # Start the loop to check for new videos
+def published_at(item):
+    """Publish time of a playlist item as an ISO 8601 string, which sorts chronologically."""
+    return item['contentDetails'].get('videoPublishedAt') or item['snippet']['publishedAt']
 
-@tasks.loop(minutes=30)
-async def check_new_video():
-    try:
-        print("Checking for new videos...")
-        channel_urls = read_channel_urls()
-
-        for url in channel_urls:
-            # Extract the handle from the URL, assuming format is https://www.youtube.com/@handle
-            if '@' in url:
-                channel_handle = url.split('@')[1]
-                channel_id = get_channel_id_by_custom_handle(channel_handle)
-
-                if channel_id:
-                    request = youtube.search().list(
-                        part='snippet',
-                        channelId=channel_id,
-                        order='date',
-                        type='video',
-                        maxResults=1
-                    )
-                    response = request.execute()
-
-                    if response['items']:
-                        latest_video = response['items'][0]
-                        video_id = latest_video['id']['videoId']
-                        posted_videos = read_posted_videos()
-
-                        if video_id and video_id not in posted_videos:
-                            write_posted_video(video_id)
-                            video_title = latest_video['snippet']['title']
-                            video_url = f'https://www.youtube.com/watch?v={video_id}'
-
-                            message = f'🎥 **New Video Uploaded:**\n{video_title}\n{video_url}'
-
-                            if channel_handle == SPECIAL_CHANNEL_HANDLE:
-                                # Post in the videos channel
-                                channel = bot.get_channel(VIDEOS_CHANNEL_ID)
-                            else:
-                                # Post in the clips and highlights channel
-                                channel = bot.get_channel(CLIPS_AND_HIGHLIGHTS_CHANNEL_ID)
-                            
-                            if channel:
-                                if not channel.permissions_for(channel.guild.me).send_messages:
-                                    print(f"Do not have permission to send messages in {channel.name}")
-                                    return
-                                await channel.send(message)
-                                print(f"Posted new video: {video_title} in {channel.name}")
-                            else:
-                                print("Channel not found.")
-                        else:
-                            print("No new video or same video found.")
-                    else:
-                        print("No new videos found in the latest API response.")
-                else:
-                    print(f"Channel not found for handle: {channel_handle}")
+def list_uploads(playlist_id, page_size, page_token):
+    """Returns one page of an uploads playlist, newest videos first."""
+    request = get_youtube().playlistItems().list(
+        part='snippet,contentDetails',
+        playlistId=playlist_id,
+        maxResults=page_size,
+        pageToken=page_token
+    )
+    return request.execute()
 
+async def get_new_uploads(channel_info, cursor):
+    """Returns the uploads newer than cursor, oldest first.
+
+    The uploads playlist lists newest videos first, so pages are read until the
+    cursor is reached. Without a cursor only the latest upload is returned, so a
+    newly added channel doesn't flood Discord with its whole history.
+    """
+    new_items = []
+    page_token = None
+    for _ in range(MAX_CATCHUP_PAGES):
+        # One call, and one quota unit, per page
+        response = await run_youtube(list_uploads, channel_info['uploads_playlist_id'], UPLOADS_PAGE_SIZE if cursor else 1, page_token)
+        for item in response.get('items', []):
+            if cursor and (item['contentDetails']['videoId'] == cursor[1] or published_at(item) < cursor[0]):
+                return new_items[::-1]
+            new_items.append(item)
+        page_token = response.get('nextPageToken')
+        if not cursor or not page_token:
+            break
+    return new_items[::-1]
+
+def chunk_messages(messages, limit=DISCORD_MESSAGE_LIMIT):
+    """Packs (video_id, message) pairs into as few Discord messages as fit under the length limit.
+
+    Returns a list of (video_ids, text) tuples.
+    """
+    chunks = []
+    video_ids, text = [], ''
+    for video_id, message in messages:
+        if text and len(text) + 2 + len(message) > limit:
+            chunks.append((video_ids, text))
+            video_ids, text = [], ''
+        video_ids.append(video_id)
+        text = f'{text}\n\n{message}' if text else message
+    if text:
+        chunks.append((video_ids, text))
+    return chunks
+
+def upload_hour(published):
+    return datetime.fromisoformat(published.replace('Z', '+00:00')).hour
+
+class ChannelSchedule:
+    """Adaptive polling interval for one YouTube channel.
+
+    Channels are polled every MIN_POLL_MINUTES right after an upload and around
+    the hours of day (UTC) of their last UPLOAD_HOURS_KEPT uploads. Otherwise the interval
+    doubles on every quiet poll, and on every failure, up to MAX_POLL_MINUTES.
+    """
+
+    def __init__(self):
+        self.next_poll = 0
+        self.interval = MIN_POLL_MINUTES * 60
+        self.failures = 0
+        self.upload_hours = deque(maxlen=UPLOAD_HOURS_KEPT)  # Older hours drop off, so they can't end up covering the whole day
+
+    def due(self, now):
+        return now >= self.next_poll
+
+    def near_upload_hour(self, now):
+        hour = datetime.fromtimestamp(now, timezone.utc).hour
+        return any(min((hour - h) % 24, (h - hour) % 24) <= 1 for h in self.upload_hours)
+
+    def record_success(self, upload_times, found_new, now):
+        self.failures = 0
+        self.upload_hours.extend(upload_hour(t) for t in upload_times)
+        if found_new or self.near_upload_hour(now):
+            self.interval = MIN_POLL_MINUTES * 60
+        else:
+            self.interval = min(self.interval * 2, MAX_POLL_MINUTES * 60)
+        self.next_poll = now + self.interval
+
+    def record_failure(self, now):
+        self.failures += 1
+        self.next_poll = now + min(MIN_POLL_MINUTES * 60 * 2 ** self.failures, MAX_POLL_MINUTES * 60)
+
+schedules = {}  # Handle -> ChannelSchedule
+
+async def check_channel(channel_handle):
+    """Announces any new uploads of one channel.
+
+    Returns the publish times of the uploads seen and whether any of them are new
+    since the last check.
+    """
+    # Resolved handles are cached in CHANNEL_IDS_FILE and cost nothing
+    channel_info = channel_ids.get(channel_handle.lstrip('@')) or await run_youtube(get_channel_by_handle, channel_handle)
+    if not channel_info:
+        print(f"Channel not found for handle: {channel_handle}")
+        return [], False
+
+    cursor = posted_videos.get_cursor(channel_info['channel_id'])
+    uploads = await get_new_uploads(channel_info, cursor)
+    videos = [item for item in uploads if item['contentDetails']['videoId'] not in posted_videos]
+
+    if videos:
+        if channel_handle == SPECIAL_CHANNEL_HANDLE:
+            # Post in the videos channel
+            channel = bot.get_channel(VIDEOS_CHANNEL_ID)
+        else:
+            # Post in the clips and highlights channel
+            channel = bot.get_channel(CLIPS_AND_HIGHLIGHTS_CHANNEL_ID)
+
+        if not channel:
+            raise RuntimeError("Discord channel not found")
+        if not channel.permissions_for(channel.guild.me).send_messages:
+            raise RuntimeError(f"Do not have permission to send messages in {channel.name}")
+
+        # Announce in chronological order, packing several videos into each message
+        messages = []
+        for item in videos:
+            video_id = item['contentDetails']['videoId']
+            video_url = f'https://www.youtube.com/watch?v={video_id}'
+            messages.append((video_id, f'🎥 **New Video Uploaded:**\n{item["snippet"]["title"]}\n{video_url}'))
+        for video_ids, text in chunk_messages(messages):
+            await channel.send(text)
+            # Only record the videos once their announcement actually went out
+            for video_id in video_ids:
+                posted_videos.add(video_id)
+        print(f"Posted {len(videos)} new video(s) from {channel_handle} in {channel.name}")
+
+    if uploads:
+        newest = uploads[-1]
+        posted_videos.set_cursor(channel_info['channel_id'], published_at(newest), newest['contentDetails']['videoId'])
+    # Without a cursor the latest upload may be old, so it only teaches us the channel's usual upload hour
+    return [published_at(item) for item in uploads], bool(cursor and uploads)
+
+async def poll_channel(channel_handle):
+    schedule = schedules.setdefault(channel_handle, ChannelSchedule())
+    try:
+        upload_times, found_new = await check_channel(channel_handle)
+    except RateLimited as e:
+        # Not the channel's fault: leave it due so the next tick tries again
+        print(f"Skipping {channel_handle} for now: {e}")
     except Exception as e:
-        print(f"Error during YouTube video check: {e}")
+        schedule.record_failure(time.time())
+        print(f"Error checking {channel_handle} (attempt {schedule.failures}, next try in {(schedule.next_poll - time.time()) / 60:.0f} min): {e}")
+    else:
+        schedule.record_success(upload_times, found_new, time.time())
+
+@tasks.loop(minutes=POLL_TICK_MINUTES)
+async def check_new_video():
+    run_as_background()
+    now = time.time()
+    # Extract the handle from the URL, assuming format is https://www.youtube.com/@handle
+    handles = [url.split('@')[1] for url in read_channel_urls() if '@' in url]
+    due = [h for h in handles if h not in schedules or schedules[h].due(now)]
+    if due:
+        print(f"Checking for new videos from {', '.join(due)}...")
+        # Each channel handles its own errors, so one failing channel never stops the others
+        await asyncio.gather(*(poll_channel(h) for h in due))
+
+@tasks.loop(hours=24)
+async def compact_posted_videos():
+    removed = posted_videos.compact()
+    if removed:
+        print(f"Pruned {removed} posted video IDs older than {POSTED_VIDEOS_RETENTION_DAYS} days")
+
+@check_new_video.before_loop
+async def before_check_new_video():
+    await bot.wait_until_ready()  # The announcement channels have to be in the cache
+
+async def setup(league_bot):
+    """Extension entry point: runs the poller inside the league bot's process."""
+    global bot
+    bot = league_bot
+    # Opened here rather than on import: if a reload fails, discord.py calls setup()
+    # of the old module again, after its teardown() closed them
+    open_poller()
+    check_new_video.start()  # Start the loop to check for new videos
+    compact_posted_videos.start()
 
-if __name__ == '__main__':
-    bot.run(DISCORD_TOKEN)
+async def teardown(league_bot):
+    """Stops the poller so the extension can be reloaded without leaking loops, threads or files."""
+    loops = (check_new_video, compact_posted_videos)
+    running = [loop.get_task() for loop in loops if loop.is_running()]
+    for loop in loops:
+        loop.cancel()
+    # Wait until they have stopped, so no poll is using the store as it closes and
+    # a setup() straight after (a failed reload rolling back) can start them again
+    await asyncio.gather(*running, return_exceptions=True)
+    close_poller()